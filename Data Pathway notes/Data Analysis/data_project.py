@@ -1,65 +1,181 @@
+import argparse
+import os
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('TkAgg')  # Comment this out if using Jupyter
-sns.set(style="whitegrid")
+from concurrent.futures import ProcessPoolExecutor
+# Run with --analysis-only for a headless text-only pass; the plotting stack
+# (matplotlib, seaborn, TkAgg) is then never imported.
+# Run with --batch to render the charts of many CSVs to files on the non-GUI
+# Agg backend, e.g. python data_project.py --batch --out-dir charts snapshots/*.csv
+DEFAULT_FILE_PATH = r'C:\Users\vinee\OneDrive\Documents\Github\tech501-preassignment\Data Pathway notes\Global_AI_Content_Impact_Dataset.csv'
+
+CHART_NAMES = ['adoption_by_industry', 'adoption_vs_job_loss', 'top_ai_tools']
+
+def load_plotting(backend):
+    """Import the plotting stack on first use, on the given matplotlib backend."""
+    import matplotlib
+    matplotlib.use(backend)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set(style="whitegrid")
+    return plt, sns
+
 # === 1. Load Dataset ===
-# Load the dataset
-file_path = r'C:\Users\vinee\OneDrive\Documents\Github\tech501-preassignment\Data Pathway notes\Global_AI_Content_Impact_Dataset.csv'
-df = pd.read_csv(file_path)
-# Display first 5 rows
-df.head()
-# === 2. Data Exploration ===
-# Get basic information about the dataset
-df.info()
-# Basic statistics
-df.describe(include='all')
-# Check for missing values
-missing = df.isnull().sum()
-print("Missing values per column:\n", missing)
-# Check shape
-print(f"Dataset contains {df.shape[0]} rows and {df.shape[1]} columns")
-# Check column names
-print("Columns:\n", df.columns.tolist())
-# === 3.Clean the Data Set ===
-# Standardize column names
-df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
-# Check for duplicates
-df.drop_duplicates(inplace=True)
-# Show the cleaned dataset
-df.head()
+def load_dataset(file_path, verbose=True):
+    # Load the dataset
+    df = pd.read_csv(file_path)
+    if verbose:
+        # Display first 5 rows
+        df.head()
+        # === 2. Data Exploration ===
+        # Get basic information about the dataset
+        df.info()
+        # Basic statistics
+        df.describe(include='all')
+        # Check for missing values
+        missing = df.isnull().sum()
+        print("Missing values per column:\n", missing)
+        # Check shape
+        print(f"Dataset contains {df.shape[0]} rows and {df.shape[1]} columns")
+        # Check column names
+        print("Columns:\n", df.columns.tolist())
+    # === 3.Clean the Data Set ===
+    # Standardize column names
+    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
+    # Check for duplicates
+    df.drop_duplicates(inplace=True)
+    return df
+
 # === 4. Transform/ Add new fields ===
 # Since 'impact_level' doesn't exist in your dataset, let's create visualizations with existing data
 # For example, we can analyze AI adoption rates by industry
- 
-# Industry adoption analysis
-industry_adoption = df.groupby('industry')['ai_adoption_rate_(%)'].mean().sort_values(ascending=False)
-print("Average AI Adoption Rate by Industry:\n", industry_adoption)
+def industry_adoption_rates(df):
+    # Industry adoption analysis
+    return df.groupby('industry')['ai_adoption_rate_(%)'].mean().sort_values(ascending=False)
+
 # === 5. Data Visualization ===
 # Let's create appropriate visualizations with your existing data
- 
-# Bar plot: AI adoption rate by industry
-plt.figure(figsize=(12, 6))
-sns.barplot(x=industry_adoption.index, y=industry_adoption.values)
-plt.title("Average AI Adoption Rate by Industry")
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
- 
-# Relationship between AI adoption and job loss
-plt.figure(figsize=(10, 6))
-sns.scatterplot(data=df, x='ai_adoption_rate_(%)', y='job_loss_due_to_ai_(%)', hue='industry')
-plt.title("Relationship Between AI Adoption and Job Loss")
-plt.tight_layout()
-plt.show()
- 
-# Distribution of top AI tools 
-plt.figure(figsize=(9, 6))
-tool_counts = df['top_ai_tools_used'].value_counts()
-sns.barplot(x=tool_counts.index, y=tool_counts.values)
-plt.title("Most Commonly Used AI Tools")
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+def draw_charts(df, industry_adoption, plt, sns):
+    """Draw the three charts one after the other, yielding each finished chart's name."""
+    # Bar plot: AI adoption rate by industry
+    plt.figure(figsize=(12, 6))
+    sns.barplot(x=industry_adoption.index, y=industry_adoption.values)
+    plt.title("Average AI Adoption Rate by Industry")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    yield CHART_NAMES[0]
+
+    # Relationship between AI adoption and job loss
+    plt.figure(figsize=(10, 6))
+    sns.scatterplot(data=df, x='ai_adoption_rate_(%)', y='job_loss_due_to_ai_(%)', hue='industry')
+    plt.title("Relationship Between AI Adoption and Job Loss")
+    plt.tight_layout()
+    yield CHART_NAMES[1]
+
+    # Distribution of top AI tools
+    plt.figure(figsize=(9, 6))
+    tool_counts = df['top_ai_tools_used'].value_counts()
+    sns.barplot(x=tool_counts.index, y=tool_counts.values)
+    plt.title("Most Commonly Used AI Tools")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    yield CHART_NAMES[2]
+
+# === 6. Batch rendering ===
+def output_dirs(file_paths, out_dir):
+    """
+    Map every input to its own chart folder under out_dir, named after its path
+    relative to the inputs' common folder (snapA/data.csv -> out_dir/snapA/data),
+    so inputs sharing a file name never overwrite each other.
+    """
+    paths = [os.path.abspath(path) for path in file_paths]
+    try:
+        base = os.path.commonpath([os.path.dirname(path) for path in paths])
+        names = [os.path.relpath(path, base) for path in paths]
+    except ValueError:
+        # Inputs on different Windows drives: keep the drive letter in the name
+        names = [path.replace(':', '', 1).lstrip(os.sep) for path in paths]
+    return {
+        file_path: os.path.join(out_dir, os.path.splitext(name)[0])
+        for file_path, name in zip(file_paths, names)
+    }
+
+def render_snapshot(file_path, target_dir, fmt='png', dpi=100):
+    """
+    Load and clean one CSV once, then save all of its charts to target_dir.
+
+    Returns:
+    tuple: (file_path, list of written files or None, error message or None)
+    """
+    try:
+        plt, sns = load_plotting('Agg')
+        df = load_dataset(file_path, verbose=False)
+        industry_adoption = industry_adoption_rates(df)
+
+        os.makedirs(target_dir, exist_ok=True)
+
+        written = []
+        for name in draw_charts(df, industry_adoption, plt, sns):
+            chart_path = os.path.join(target_dir, f"{name}.{fmt}")
+            plt.savefig(chart_path, dpi=dpi)
+            plt.close()
+            written.append(chart_path)
+        return file_path, written, None
+    except Exception as e:
+        return file_path, None, str(e)
+
+def render_batch(file_paths, out_dir, workers=None, fmt='png', dpi=100):
+    """
+    Render the chart set of every CSV in parallel worker processes.
+
+    Returns:
+    int: Number of inputs that failed
+    """
+    # The same file listed twice is rendered once
+    file_paths = list(dict.fromkeys(file_paths))
+    targets = output_dirs(file_paths, out_dir)
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = [executor.submit(render_snapshot, path, targets[path], fmt, dpi) for path in file_paths]
+        for job in jobs:
+            file_path, written, error = job.result()
+            if error:
+                failures += 1
+                print(f"⚠️ Failed to render {file_path}: {error}")
+            else:
+                print(f"✅ {file_path}: {len(written)} charts")
+    print(f"Rendered {len(file_paths) - failures}/{len(file_paths)} inputs into '{out_dir}'")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="AI adoption exploration charts")
+    parser.add_argument('inputs', nargs='*', help="CSV file(s) to analyse")
+    parser.add_argument('--analysis-only', action='store_true', help="Print the analysis without any charts")
+    parser.add_argument('--batch', action='store_true', help="Save the charts of every input to files instead of showing them")
+    parser.add_argument('--out-dir', default='batch_charts', help="Output folder for --batch (default: batch_charts)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes for --batch (default: one per CPU)")
+    parser.add_argument('--format', default='png', choices=['png', 'svg', 'pdf'], help="Chart file format for --batch")
+    parser.add_argument('--dpi', type=int, default=100, help="Chart resolution for --batch")
+    args = parser.parse_args()
+
+    if args.batch:
+        if not args.inputs:
+            parser.error("--batch needs at least one input CSV")
+        return 1 if render_batch(args.inputs, args.out_dir, args.workers, args.format, args.dpi) else 0
+
+    file_path = args.inputs[0] if args.inputs else DEFAULT_FILE_PATH
+    df = load_dataset(file_path)
+    # Show the cleaned dataset
+    df.head()
+    industry_adoption = industry_adoption_rates(df)
+    print("Average AI Adoption Rate by Industry:\n", industry_adoption)
+
+    if not args.analysis_only:
+        # Plotting imports are deferred until the first chart is rendered
+        plt, sns = load_plotting('TkAgg')  # Comment this out if using Jupyter
+        for _ in draw_charts(df, industry_adoption, plt, sns):
+            plt.show()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
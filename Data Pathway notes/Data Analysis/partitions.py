@@ -0,0 +1,90 @@
+import os
+from urllib.parse import unquote
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+# ===============================================================
+# HIVE-STYLE PARTITIONED DATASET READER
+# ===============================================================
+#
+# Reads a directory laid out as key=value folders, e.g.
+#   data/year=2024/country=USA/part-0.csv
+#   data/year=2025/country=India/part-0.parquet
+# Partitions that cannot match the filters are skipped without being opened.
+
+DATA_EXTENSIONS = ('.csv', '.parquet')
+
+def standardize_name(name):
+    """Same column-name cleaning as load_and_clean_data."""
+    return name.strip().lower().replace(' ', '_')
+
+def discover_partitions(root):
+    """
+    Find every data file under root with the partition values from its path.
+    
+    Returns:
+    list: (file path, {partition key: value as string}) tuples
+    """
+    files = []
+    for directory, _, names in os.walk(root):
+        relative = os.path.relpath(directory, root)
+        values = {}
+        if relative != '.':
+            for part in relative.split(os.sep):
+                if '=' in part:
+                    # pandas/pyarrow URI-encode folder names, e.g. country=South%20Korea
+                    key, value = part.split('=', 1)
+                    values[standardize_name(unquote(key))] = unquote(value)
+        for name in sorted(names):
+            if name.endswith(DATA_EXTENSIONS) and not name.startswith(('.', '_')):
+                files.append((os.path.join(directory, name), values))
+    return sorted(files)
+
+def matches(values, filters):
+    """True unless a partition value rules the file out for one of the filters."""
+    for key, allowed in filters.items():
+        if allowed and key in values and values[key] not in {str(item) for item in allowed}:
+            return False
+    return True
+
+def _read_file(path, values, columns):
+    if path.endswith('.parquet'):
+        wanted = None
+        if columns is not None:
+            import pyarrow.parquet as pq
+            wanted = [name for name in pq.read_schema(path).names if standardize_name(name) in columns]
+        df = pd.read_parquet(path, columns=wanted)
+    else:
+        usecols = None if columns is None else (lambda name: standardize_name(name) in columns)
+        df = pd.read_csv(path, usecols=usecols)
+    
+    # Partition values come from the path; they win over any copy in the file
+    df = df[[name for name in df.columns if standardize_name(name) not in values]]
+    for key, value in values.items():
+        if columns is None or key in columns:
+            df[key] = value
+    return df
+
+def read_partitioned(root, filters=None, columns=None, workers=8):
+    """
+    Read the files of a partitioned directory in parallel, after pruning.
+    
+    Parameters:
+    root (str): Dataset directory
+    filters (dict): Cleaned column name -> allowed values, e.g. {'year': [2024]}
+    columns (iterable): Cleaned column names to load (None loads all)
+    workers (int): Number of reader threads
+    
+    Returns:
+    tuple: (pd.DataFrame with original column names, files read, files in dataset)
+    """
+    filters = filters or {}
+    columns = None if columns is None else set(columns) | {key for key, allowed in filters.items() if allowed}
+    files = discover_partitions(root)
+    selected = [(path, values) for path, values in files if matches(values, filters)]
+    if not selected:
+        raise FileNotFoundError(f"No data files match the filters under {root}")
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        frames = list(executor.map(lambda item: _read_file(item[0], item[1], columns), selected))
+    return pd.concat(frames, ignore_index=True), len(selected), len(files)
@@ -0,0 +1,158 @@
+import numpy as np
+
+# ===============================================================
+# VECTORISED RESAMPLING INFERENCE (BOOTSTRAP + PERMUTATION TESTS)
+# ===============================================================
+#
+# Every resample is a row of an index (or label) matrix, and each chunk of
+# resamples is evaluated with whole-matrix NumPy operations. Chunks hold at
+# most MAX_CHUNK_ELEMENTS indices, so memory stays bounded however many rows
+# or resamples there are.
+
+MAX_CHUNK_ELEMENTS = 2 ** 22  # ~32 MB per float64 matrix
+
+def _chunk_sizes(n_resamples, row_count, max_elements=MAX_CHUNK_ELEMENTS):
+    """Split n_resamples into chunks of at most max_elements indices each."""
+    per_chunk = max(1, max_elements // max(row_count, 1))
+    while n_resamples > 0:
+        size = min(per_chunk, n_resamples)
+        yield size
+        n_resamples -= size
+
+def percentile_interval(samples, confidence=0.95):
+    """Percentile confidence interval over the first axis of `samples`."""
+    tail = (1 - confidence) / 2 * 100
+    return np.nanpercentile(samples, [tail, 100 - tail], axis=0)
+
+def bootstrap_correlation(x, y, n_resamples=10000, confidence=0.95, seed=None):
+    """
+    Bootstrap confidence interval for the Pearson correlation of x and y.
+
+    Returns:
+    tuple: (low, high)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in _chunk_sizes(n_resamples, n):
+        idx = rng.integers(0, n, size=(size, n))
+        xs = x[idx]
+        ys = y[idx]
+        xs -= xs.mean(axis=1, keepdims=True)
+        ys -= ys.mean(axis=1, keepdims=True)
+        cov = np.einsum('ij,ij->i', xs, ys)
+        var_x = np.einsum('ij,ij->i', xs, xs)
+        var_y = np.einsum('ij,ij->i', ys, ys)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            results.append(cov / np.sqrt(var_x * var_y))
+    low, high = percentile_interval(np.concatenate(results), confidence)
+    return low, high
+
+def bootstrap_means(values, n_resamples=10000, seed=None):
+    """
+    Bootstrap distribution of the column means of `values`.
+
+    Parameters:
+    values (array): Shape (rows,) or (rows, metrics)
+
+    Returns:
+    np.ndarray: Shape (n_resamples, metrics) of resampled means
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n, metrics = values.shape
+    rng = np.random.default_rng(seed)
+    means = np.empty((n_resamples, metrics))
+    start = 0
+    for size in _chunk_sizes(n_resamples, n):
+        idx = rng.integers(0, n, size=(size, n))
+        # Gather one metric at a time so a chunk never holds more than size * n values
+        for m in range(metrics):
+            means[start:start + size, m] = values[idx, m].mean(axis=1)
+        start += size
+    return means
+
+def bootstrap_mean_ci(values, n_resamples=10000, confidence=0.95, seed=None):
+    """
+    Bootstrap confidence intervals for the column means of `values`.
+
+    Returns:
+    tuple: (low, high) arrays with one entry per metric
+    """
+    low, high = percentile_interval(bootstrap_means(values, n_resamples, seed), confidence)
+    return low, high
+
+def bootstrap_cagr_ci(initial_values, final_values, years, n_resamples=10000, confidence=0.95, seed=None):
+    """
+    Bootstrap confidence intervals for the compound annual growth rate between
+    the mean of initial_values and the mean of final_values.
+
+    The first and last year are resampled independently; resamples with a
+    non-positive initial mean are left out of the interval.
+
+    Returns:
+    tuple: (low, high) arrays with one entry per metric (NaN when years <= 0)
+    """
+    if years <= 0:
+        metrics = np.atleast_2d(np.asarray(initial_values, dtype=float).T).shape[0]
+        return np.full(metrics, np.nan), np.full(metrics, np.nan)
+    rng = np.random.default_rng(seed)
+    initial = bootstrap_means(initial_values, n_resamples, rng)
+    final = bootstrap_means(final_values, n_resamples, rng)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cagr = np.where(initial > 0, (final / initial) ** (1 / years) - 1, np.nan)
+    low, high = percentile_interval(cagr, confidence)
+    return low, high
+
+def _f_statistics(group_sums, group_sizes, grand_mean, total_ss, n, k):
+    """One-way ANOVA F statistics from per-group sums, for every resample at once."""
+    group_means = group_sums / group_sizes[:, None]
+    between = (group_sizes[:, None] * (group_means - grand_mean) ** 2).sum(axis=-2)
+    within = total_ss - between
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (between / (k - 1)) / (within / (n - k))
+
+def permutation_anova(values, labels, n_permutations=10000, seed=None):
+    """
+    Permutation test of a one-way ANOVA: how often does shuffling the group
+    labels give an F statistic at least as large as the observed one?
+
+    Parameters:
+    values (array): Shape (rows,) or (rows, metrics)
+    labels (array): Group label of every row
+
+    Returns:
+    tuple: (observed F per metric, permutation p-value per metric); the
+    p-value is NaN where F is undefined (fewer than two groups, no rows
+    left within the groups, or no variance)
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    groups, codes = np.unique(np.asarray(labels), return_inverse=True)
+    n, k = len(codes), len(groups)
+    group_sizes = np.bincount(codes, minlength=k).astype(float)
+    grand_mean = values.mean(axis=0)
+    total_ss = ((values - grand_mean) ** 2).sum(axis=0)
+    one_hot = np.eye(k)
+
+    observed = _f_statistics(one_hot[codes].T @ values, group_sizes, grand_mean, total_ss, n, k)
+    undefined = ~np.isfinite(observed)
+    if k < 2 or n <= k or undefined.all():
+        return observed, np.full(values.shape[1], np.nan)
+
+    rng = np.random.default_rng(seed)
+    exceed = np.zeros(values.shape[1])
+    for size in _chunk_sizes(n_permutations, n * k):
+        shuffled = rng.permuted(np.broadcast_to(codes, (size, n)), axis=1)
+        # (size, k, n) group membership @ (n, metrics) -> per-group sums per permutation
+        group_sums = one_hot[shuffled].transpose(0, 2, 1) @ values
+        f_values = _f_statistics(group_sums, group_sizes, grand_mean, total_ss, n, k)
+        exceed += (f_values >= observed).sum(axis=0)
+
+    p_values = (exceed + 1) / (n_permutations + 1)
+    p_values[undefined] = np.nan
+    return observed, p_values
@@ -1,26 +1,87 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.colors import ListedColormap
-import matplotlib.ticker as mtick
+import argparse
+import io
 import os
+from typing import Callable, Dict, NamedTuple, Optional
+from task_graph import Task, select_tasks, run_tasks
+from partitions import read_partitioned, standardize_name
+from resampling import bootstrap_correlation, bootstrap_mean_ci, bootstrap_cagr_ci, permutation_anova
 
-# Set the aesthetic style for our plots
-sns.set(style="whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
-plt.rcParams['font.size'] = 12
+# Number of bootstrap resamples / permutations, and a fixed seed so the
+# reported intervals are the same on every run
+N_RESAMPLES = 10000
+RESAMPLING_SEED = 42
+
+# Column names after load_and_clean_data has standardized them
+ADOPTION = 'ai_adoption_rate_(%)'
+CONTENT_VOLUME = 'ai-generated_content_volume_(tbs_per_year)'
+JOB_LOSS = 'job_loss_due_to_ai_(%)'
+REVENUE = 'revenue_increase_due_to_ai_(%)'
+COLLABORATION = 'human-ai_collaboration_rate_(%)'
+TRUST = 'consumer_trust_in_ai_(%)'
+MARKET_SHARE = 'market_share_of_ai_companies_(%)'
+
+# The plotting stack (matplotlib + seaborn) is only imported the first time a
+# chart is rendered, so the text-only analysis starts without paying for it.
+plt = None
+sns = None
+mtick = None
+ListedColormap = None
+
+def load_plotting():
+    """
+    Import matplotlib and seaborn on first use and apply the plot style.
+    
+    Uses the non-GUI 'Agg' backend since every chart is saved to a file.
+    """
+    global plt, sns, mtick, ListedColormap
+    if plt is not None:
+        return
+    
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as _plt
+    import matplotlib.ticker as _mtick
+    import seaborn as _sns
+    from matplotlib.colors import ListedColormap as _ListedColormap
+    
+    # Set the aesthetic style for our plots
+    _sns.set(style="whitegrid")
+    _plt.rcParams['figure.figsize'] = (12, 8)
+    _plt.rcParams['font.size'] = 12
+    
+    plt, sns, mtick, ListedColormap = _plt, _sns, _mtick, _ListedColormap
+
+def save_chart(filename, output=None):
+    """
+    Save the current figure as visualizations/<filename>, or hand it to `output`.
+    
+    Parameters:
+    filename (str): File name used when saving to the 'visualizations' folder
+    output (callable): Optional function called with the figure instead, e.g.
+                       to render it into memory at another size or format
+    """
+    if output is None:
+        plt.savefig(os.path.join('visualizations', filename), dpi=300, bbox_inches='tight')
+    else:
+        output(plt.gcf())
+    plt.close()
 
 # ===============================================================
 # PART 1: DATA LOADING AND CLEANING
 # ===============================================================
 
-def load_and_clean_data(file_path):
+def load_and_clean_data(file_path, years=None, countries=None, columns=None):
     """
     Load the CSV file and perform initial data cleaning.
     
     Parameters:
-    file_path (str): Path to the CSV file
+    file_path (str): Path to the CSV file, or to a directory partitioned as
+                     year=.../country=.../*.csv|*.parquet
+    years (list): Only keep these years (prunes year= partitions)
+    countries (list): Only keep these countries (prunes country= partitions)
+    columns (iterable): Cleaned column names to load (None loads all)
     
     Returns:
     pd.DataFrame: Cleaned dataframe
@@ -29,8 +90,20 @@ def load_and_clean_data(file_path):
     
     try:
         # Load the dataset
-        df = pd.read_csv(file_path)
-        print(f"Successfully loaded data from: {file_path}")
+        # year and country are always loaded: cleaning and the filters rely on them
+        if columns is not None:
+            columns = set(columns) | {'year', 'country'}
+        if os.path.isdir(file_path):
+            df, files_read, files_total = read_partitioned(
+                file_path, filters={'year': years, 'country': countries}, columns=columns
+            )
+            print(f"Successfully loaded {files_read} of {files_total} partition files from: {file_path}")
+        else:
+            usecols = None if columns is None else (
+                lambda name: standardize_name(name) in columns
+            )
+            df = pd.read_csv(file_path, usecols=usecols)
+            print(f"Successfully loaded data from: {file_path}")
         
         # Display basic information about the dataset
         print(f"Dataset dimensions: {df.shape[0]} rows and {df.shape[1]} columns")
@@ -53,6 +126,14 @@ def load_and_clean_data(file_path):
         # Convert year to integer if it's not already
         df['year'] = df['year'].astype(int)
         
+        # Rows outside the filters (partitions only prune whole files)
+        if years:
+            df = df[df['year'].isin([int(year) for year in years])]
+        if countries:
+            df = df[df['country'].isin(countries)]
+        if years or countries:
+            print(f"Rows matching the year/country filters: {df.shape[0]}")
+        
         return df
     
     except FileNotFoundError:
@@ -154,9 +235,10 @@ def create_visualizations(df):
     
     print("\nAll visualizations created and saved in the 'visualizations' folder.")
 
-def visualize_ai_adoption_by_country(df):
+def visualize_ai_adoption_by_country(df, output=None):
     """Create a horizontal bar chart of average AI adoption rate by country."""
     print("Creating AI adoption by country visualization...")
+    load_plotting()
     
     # Calculate average adoption rate by country
     country_adoption = df.groupby('country')['ai_adoption_rate_(%)'].mean().sort_values(ascending=False)
@@ -178,12 +260,12 @@ def visualize_ai_adoption_by_country(df):
         ax.text(v + 1, i, f"{v:.1f}%", va='center', fontsize=10)
     
     plt.tight_layout()
-    plt.savefig('visualizations/ai_adoption_by_country.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    save_chart('ai_adoption_by_country.png', output)
 
-def visualize_ai_adoption_by_industry(df):
+def visualize_ai_adoption_by_industry(df, output=None):
     """Create a horizontal bar chart of average AI adoption rate by industry."""
     print("Creating AI adoption by industry visualization...")
+    load_plotting()
     
     # Calculate average adoption rate by industry
     industry_adoption = df.groupby('industry')['ai_adoption_rate_(%)'].mean().sort_values(ascending=False)
@@ -205,12 +287,12 @@ def visualize_ai_adoption_by_industry(df):
         ax.text(v + 1, i, f"{v:.1f}%", va='center', fontsize=10)
     
     plt.tight_layout()
-    plt.savefig('visualizations/ai_adoption_by_industry.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    save_chart('ai_adoption_by_industry.png', output)
 
-def visualize_job_loss_vs_revenue(df):
+def visualize_job_loss_vs_revenue(df, output=None):
     """Create a scatter plot of job loss vs revenue increase with industry encoding."""
     print("Creating job loss vs revenue increase visualization...")
+    load_plotting()
     
     # Create the plot
     plt.figure(figsize=(14, 10))
@@ -272,12 +354,12 @@ def visualize_job_loss_vs_revenue(df):
     plt.plot(x, m*x + b, 'r--', alpha=0.7)
     
     plt.tight_layout()
-    plt.savefig('visualizations/job_loss_vs_revenue.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    save_chart('job_loss_vs_revenue.png', output)
 
-def visualize_ai_tools_distribution(df):
+def visualize_ai_tools_distribution(df, output=None):
     """Create a pie chart showing the distribution of top AI tools used."""
     print("Creating AI tools distribution visualization...")
+    load_plotting()
     
     # Count the occurrences of each AI tool
     tools_counts = df['top_ai_tools_used'].value_counts()
@@ -311,12 +393,12 @@ def visualize_ai_tools_distribution(df):
     plt.axis('equal')
     
     plt.tight_layout()
-    plt.savefig('visualizations/ai_tools_distribution.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    save_chart('ai_tools_distribution.png', output)
 
-def visualize_ai_adoption_trend(df):
+def visualize_ai_adoption_trend(df, output=None):
     """Create a line plot showing the trend of AI adoption rate over years."""
     print("Creating AI adoption trend visualization...")
+    load_plotting()
     
     # Calculate average adoption rate by year
     year_adoption = df.groupby('year')['ai_adoption_rate_(%)'].mean()
@@ -360,12 +442,12 @@ def visualize_ai_adoption_trend(df):
     plt.xticks(year_adoption.index)
     
     plt.tight_layout()
-    plt.savefig('visualizations/ai_adoption_trend.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    save_chart('ai_adoption_trend.png', output)
 
-def visualize_correlation_heatmap(df):
+def visualize_correlation_heatmap(df, output=None):
     """Create a heatmap of correlations between numerical variables."""
     print("Creating correlation heatmap...")
+    load_plotting()
     
     # Select numerical columns
     numerical_cols = df.select_dtypes(include=['float64', 'int64']).columns
@@ -394,12 +476,12 @@ def visualize_correlation_heatmap(df):
     plt.title('Correlation Matrix of Numerical Variables', fontsize=16)
     
     plt.tight_layout()
-    plt.savefig('visualizations/correlation_heatmap.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    save_chart('correlation_heatmap.png', output)
 
-def visualize_human_ai_collaboration_vs_trust(df):
+def visualize_human_ai_collaboration_vs_trust(df, output=None):
     """Create a scatter plot of human-AI collaboration vs consumer trust."""
     print("Creating human-AI collaboration vs consumer trust visualization...")
+    load_plotting()
     
     # Create the figure
     plt.figure(figsize=(14, 10))
@@ -456,12 +538,12 @@ def visualize_human_ai_collaboration_vs_trust(df):
     plt.plot(x, m*x + b, 'r--', alpha=0.7)
     
     plt.tight_layout()
-    plt.savefig('visualizations/collaboration_vs_trust.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    save_chart('collaboration_vs_trust.png', output)
 
-def visualize_content_volume_by_country_year(df):
+def visualize_content_volume_by_country_year(df, output=None):
     """Create a grouped bar chart showing AI-generated content volume by country and year."""
     print("Creating content volume by country and year visualization...")
+    load_plotting()
     
     # Prepare data: average content volume by country and year
     content_by_country_year = df.pivot_table(
@@ -494,12 +576,12 @@ def visualize_content_volume_by_country_year(df):
     plt.grid(True, linestyle='--', alpha=0.7, axis='y')
     
     plt.tight_layout()
-    plt.savefig('visualizations/content_volume_by_country_year.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    save_chart('content_volume_by_country_year.png', output)
 
-def visualize_regulation_impact(df):
+def visualize_regulation_impact(df, output=None):
     """Create a multi-faceted visualization showing the impact of regulation status on various metrics."""
     print("Creating regulation impact visualization...")
+    load_plotting()
     
     # Prepare data: average metrics by regulation status
     metrics = [
@@ -561,13 +643,86 @@ def visualize_regulation_impact(df):
     plt.suptitle('Impact of Regulation Status on AI Metrics', fontsize=18, y=0.98)
     
     plt.tight_layout(rect=[0, 0, 1, 0.96])  # Adjust layout to make room for suptitle
-    plt.savefig('visualizations/regulation_impact.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    save_chart('regulation_impact.png', output)
 
 # ===============================================================
 # PART 4: ADVANCED ANALYSIS FUNCTIONS
 # ===============================================================
 
+class DerivedMetric(NamedTuple):
+    """
+    A metric computed from the base columns, evaluated lazily.
+    
+    expr (callable): Builds the full-length series from the dataframe
+    linear (dict): Column -> weight when the metric is a weighted sum of
+                   columns; its group means are then combined from the
+                   group means of those columns without building the series
+    """
+    expr: Callable
+    linear: Optional[Dict[str, float]] = None
+
+PERCENT_BINS = [0, 25, 50, 75, 100]
+PERCENT_LABELS = ['0-25%', '25-50%', '50-75%', '75-100%']
+
+# Derived metrics are never written back onto the dataframe: each one only
+# exists for the duration of the groupby that needs it (see group_means)
+DERIVED_METRICS = {
+    'adoption_range': DerivedMetric(lambda df: pd.cut(df[ADOPTION], bins=PERCENT_BINS, labels=PERCENT_LABELS)),
+    'collaboration_range': DerivedMetric(lambda df: pd.cut(df[COLLABORATION], bins=PERCENT_BINS, labels=PERCENT_LABELS)),
+    'roi': DerivedMetric(lambda df: df[REVENUE] / df[ADOPTION]),
+    'content_efficiency': DerivedMetric(lambda df: df[CONTENT_VOLUME] / df[ADOPTION]),
+    'job_preservation_score': DerivedMetric(
+        lambda df: df[ADOPTION] - df[JOB_LOSS], linear={ADOPTION: 1, JOB_LOSS: -1}
+    ),
+    'net_benefit': DerivedMetric(
+        lambda df: df[REVENUE] - df[JOB_LOSS], linear={REVENUE: 1, JOB_LOSS: -1}
+    ),
+}
+
+def derived(df, name):
+    """Evaluate a derived metric as a temporary series (df is not modified)."""
+    series = DERIVED_METRICS[name].expr(df)
+    series.name = name
+    return series
+
+def group_key(df, by):
+    """Group by a column or, without materializing it on df, by a derived metric."""
+    return derived(df, by) if by in DERIVED_METRICS else df[by]
+
+def group_means(df, by, columns):
+    """
+    Mean of base columns and derived metrics per group of `by`.
+    
+    Base columns are aggregated directly. A linear derived metric is combined
+    from the group means of its columns, so its full-length series is never
+    built (unless those columns have missing values, where the mean of the
+    difference is not the difference of the means). Any other derived metric
+    is evaluated as a temporary series for this aggregation only.
+    
+    Returns:
+    pd.DataFrame: One row per group, one column per entry of `columns`
+    """
+    key = group_key(df, by)
+    base = [column for column in columns if column not in DERIVED_METRICS]
+    fused = {
+        name: DERIVED_METRICS[name].linear for name in columns
+        if name in DERIVED_METRICS and DERIVED_METRICS[name].linear
+        and not any(df[column].hasnans for column in DERIVED_METRICS[name].linear)
+    }
+    needed = list(dict.fromkeys(base + [column for weights in fused.values() for column in weights]))
+    # Selecting the columns on the groupby (not df[needed] first) avoids copying them
+    means = df.groupby(key)[needed].mean() if needed else pd.DataFrame(index=key.unique())
+    
+    result = {}
+    for name in columns:
+        if name in fused:
+            result[name] = sum(weight * means[column] for column, weight in fused[name].items())
+        elif name in DERIVED_METRICS:
+            result[name] = derived(df, name).groupby(key).mean()
+        else:
+            result[name] = means[name]
+    return pd.DataFrame(result)
+
 def perform_advanced_analysis(df):
     """
     Perform more complex analyses on the dataset.
@@ -601,27 +756,22 @@ def analyze_adoption_revenue_relationship(df):
     # Calculate correlation
     correlation = df['ai_adoption_rate_(%)'].corr(df['revenue_increase_due_to_ai_(%)'])
     print(f"Correlation between AI adoption rate and revenue increase: {correlation:.2f}")
+    low, high = bootstrap_correlation(df['ai_adoption_rate_(%)'], df['revenue_increase_due_to_ai_(%)'], N_RESAMPLES, seed=RESAMPLING_SEED)
+    print(f"95% bootstrap confidence interval: [{low:.2f}, {high:.2f}]")
     
     # Group by adoption rate ranges and calculate average revenue increase
-    df['adoption_range'] = pd.cut(
-        df['ai_adoption_rate_(%)'], 
-        bins=[0, 25, 50, 75, 100], 
-        labels=['0-25%', '25-50%', '50-75%', '75-100%']
-    )
-    
-    adoption_revenue = df.groupby('adoption_range')['revenue_increase_due_to_ai_(%)'].agg(['mean', 'count'])
+    adoption_revenue = df['revenue_increase_due_to_ai_(%)'].groupby(group_key(df, 'adoption_range')).agg(['mean', 'count'])
     print("\nAverage revenue increase by AI adoption rate range:")
     print(adoption_revenue)
     
     # Find industries with highest and lowest ROI (revenue increase / adoption rate)
-    df['roi'] = df['revenue_increase_due_to_ai_(%)'] / df['ai_adoption_rate_(%)']
-    
-    industry_roi = df.groupby('industry')['roi'].mean().sort_values(ascending=False)
+    roi = derived(df, 'roi')
+    industry_roi = roi.groupby(df['industry']).mean().sort_values(ascending=False)
     print("\nIndustries ranked by AI ROI (Revenue Increase / Adoption Rate):")
     print(industry_roi)
     
     # Find countries with highest and lowest ROI
-    country_roi = df.groupby('country')['roi'].mean().sort_values(ascending=False)
+    country_roi = roi.groupby(df['country']).mean().sort_values(ascending=False)
     print("\nCountries ranked by AI ROI (Revenue Increase / Adoption Rate):")
     print(country_roi)
 
@@ -632,22 +782,16 @@ def analyze_job_displacement_vs_collaboration(df):
     # Calculate correlation
     correlation = df['job_loss_due_to_ai_(%)'].corr(df['human-ai_collaboration_rate_(%)'])
     print(f"Correlation between job loss and human-AI collaboration rate: {correlation:.2f}")
+    low, high = bootstrap_correlation(df['job_loss_due_to_ai_(%)'], df['human-ai_collaboration_rate_(%)'], N_RESAMPLES, seed=RESAMPLING_SEED)
+    print(f"95% bootstrap confidence interval: [{low:.2f}, {high:.2f}]")
     
     # Group by collaboration rate ranges and calculate average job loss
-    df['collaboration_range'] = pd.cut(
-        df['human-ai_collaboration_rate_(%)'], 
-        bins=[0, 25, 50, 75, 100], 
-        labels=['0-25%', '25-50%', '50-75%', '75-100%']
-    )
-    
-    collaboration_job_loss = df.groupby('collaboration_range')['job_loss_due_to_ai_(%)'].agg(['mean', 'count'])
+    collaboration_job_loss = df['job_loss_due_to_ai_(%)'].groupby(group_key(df, 'collaboration_range')).agg(['mean', 'count'])
     print("\nAverage job loss by human-AI collaboration rate range:")
     print(collaboration_job_loss)
     
     # Find the best and worst industries for balancing job preservation with AI adoption
-    df['job_preservation_score'] = df['ai_adoption_rate_(%)'] - df['job_loss_due_to_ai_(%)']
-    
-    industry_job_preservation = df.groupby('industry')[['job_preservation_score', 'ai_adoption_rate_(%)', 'job_loss_due_to_ai_(%)']].mean().sort_values(by='job_preservation_score', ascending=False)
+    industry_job_preservation = group_means(df, 'industry', ['job_preservation_score', 'ai_adoption_rate_(%)', 'job_loss_due_to_ai_(%)']).sort_values(by='job_preservation_score', ascending=False)
     print("\nIndustries ranked by job preservation score (adoption rate - job loss):")
     print(industry_job_preservation)
 
@@ -685,6 +829,24 @@ def analyze_regulation_impact(df):
     except Exception as e:
         print(f"\nError performing ANOVA tests: {str(e)}")
     
+    # Permutation tests make no normality assumption, unlike the ANOVA above
+    print(f"\nPermutation tests ({N_RESAMPLES} label shuffles) for the regulation groups:")
+    f_values, p_values = permutation_anova(df[metrics], df['regulation_status'], N_RESAMPLES, seed=RESAMPLING_SEED)
+    for metric, f_val, p_val in zip(metrics, f_values, p_values):
+        if np.isnan(p_val):
+            print(f"{metric}: skipped - needs at least two regulation groups with varying values")
+            continue
+        significance = "Significant" if p_val < 0.05 else "Not significant"
+        print(f"{metric}: F={f_val:.2f}, permutation p={p_val:.4f} - {significance}")
+    
+    # Bootstrap confidence intervals for the group means
+    print("\n95% bootstrap confidence intervals for the average metrics by regulation status:")
+    for status, group in df.groupby('regulation_status')[metrics]:
+        low, high = bootstrap_mean_ci(group, N_RESAMPLES, seed=RESAMPLING_SEED)
+        print(f"\n{status}:")
+        for metric, mean, lo, hi in zip(metrics, group.mean(), low, high):
+            print(f"  {metric}: {mean:.2f} [{lo:.2f}, {hi:.2f}]")
+    
     # Analyze which tools are most common in different regulatory environments
     regulation_tools = pd.crosstab(
         df['regulation_status'], 
@@ -718,17 +880,27 @@ def analyze_time_trends(df):
     max_year = df['year'].max()
     years_diff = max_year - min_year
     
-    print("\nCompound Annual Growth Rate (CAGR) for key metrics:")
-    for metric in metrics:
-        try:
-            initial_value = time_trends.loc[min_year, metric]
-            final_value = time_trends.loc[max_year, metric]
-            
-            if initial_value > 0:  # Avoid division by zero
-                cagr = (final_value / initial_value) ** (1 / years_diff) - 1
-                print(f"{metric}: {cagr:.2%}")
-        except Exception as e:
-            print(f"Error calculating CAGR for {metric}: {str(e)}")
+    if years_diff <= 0:
+        print("\nCompound Annual Growth Rate (CAGR): skipped - needs at least two years of data")
+    else:
+        # Bootstrap intervals resample the rows of the first and last year
+        cagr_low, cagr_high = bootstrap_cagr_ci(
+            df.loc[df['year'] == min_year, metrics],
+            df.loc[df['year'] == max_year, metrics],
+            years_diff, N_RESAMPLES, seed=RESAMPLING_SEED
+        )
+        
+        print("\nCompound Annual Growth Rate (CAGR) for key metrics (95% bootstrap CI):")
+        for metric, low, high in zip(metrics, cagr_low, cagr_high):
+            try:
+                initial_value = time_trends.loc[min_year, metric]
+                final_value = time_trends.loc[max_year, metric]
+                
+                if initial_value > 0:  # Avoid division by zero
+                    cagr = (final_value / initial_value) ** (1 / years_diff) - 1
+                    print(f"{metric}: {cagr:.2%} [{low:.2%}, {high:.2%}]")
+            except Exception as e:
+                print(f"Error calculating CAGR for {metric}: {str(e)}")
     
     # Analyze changing popularity of AI tools over time
     tools_by_year = pd.crosstab(
@@ -760,9 +932,7 @@ def analyze_industry_patterns(df):
     print(industry_metrics.round(2))
     
     # Find which industries have the highest content volume per adoption rate
-    df['content_efficiency'] = df['ai-generated_content_volume_(tbs_per_year)'] / df['ai_adoption_rate_(%)']
-    
-    industry_content_efficiency = df.groupby('industry')[['content_efficiency']].mean().sort_values(by='content_efficiency', ascending=False)
+    industry_content_efficiency = group_means(df, 'industry', ['content_efficiency']).sort_values(by='content_efficiency', ascending=False)
     print("\nIndustries ranked by content generation efficiency (volume / adoption rate):")
     print(industry_content_efficiency.round(2))
     
@@ -777,49 +947,209 @@ def analyze_industry_patterns(df):
     print(industry_tools.round(1))
     
     # Find the most profitable industries (revenue increase - job loss)
-    df['net_benefit'] = df['revenue_increase_due_to_ai_(%)'] - df['job_loss_due_to_ai_(%)']
-    
-    industry_net_benefit = df.groupby('industry')[['net_benefit', 'revenue_increase_due_to_ai_(%)', 'job_loss_due_to_ai_(%)']].mean().sort_values(by='net_benefit', ascending=False)
+    industry_net_benefit = group_means(df, 'industry', ['net_benefit', 'revenue_increase_due_to_ai_(%)', 'job_loss_due_to_ai_(%)']).sort_values(by='net_benefit', ascending=False)
     print("\nIndustries ranked by net benefit (revenue increase - job loss):")
     print(industry_net_benefit.round(2))
 
 # ===============================================================
-# PART 5: MAIN FUNCTION
+# PART 5: PIPELINE TASK GRAPH
+# ===============================================================
+
+NUMERIC_COLUMNS = ('year', ADOPTION, CONTENT_VOLUME, JOB_LOSS, REVENUE, COLLABORATION, TRUST, MARKET_SHARE)
+METRIC_COLUMNS = (ADOPTION, JOB_LOSS, REVENUE, COLLABORATION, TRUST, MARKET_SHARE)
+BASE_COLUMNS = ('country', 'industry', 'top_ai_tools_used', 'regulation_status') + NUMERIC_COLUMNS
+
+# Every step declares the columns it reads and any columns it adds to its
+# frame. A step only waits for the steps producing columns it reads. The
+# analyses compute their derived metrics lazily (DERIVED_METRICS), so none of
+# them produces columns today.
+PIPELINE_TASKS = [
+    Task('eda', perform_eda, reads=BASE_COLUMNS),
+    Task('chart_adoption_by_country', visualize_ai_adoption_by_country, reads=('country', ADOPTION), plots=True),
+    Task('chart_adoption_by_industry', visualize_ai_adoption_by_industry, reads=('industry', ADOPTION), plots=True),
+    Task('chart_job_loss_vs_revenue', visualize_job_loss_vs_revenue, reads=('industry', JOB_LOSS, REVENUE, ADOPTION), plots=True),
+    Task('chart_tools_distribution', visualize_ai_tools_distribution, reads=('top_ai_tools_used',), plots=True),
+    Task('chart_adoption_trend', visualize_ai_adoption_trend, reads=('year', ADOPTION), plots=True),
+    Task('chart_correlation_heatmap', visualize_correlation_heatmap, reads=NUMERIC_COLUMNS, plots=True),
+    Task('chart_collaboration_vs_trust', visualize_human_ai_collaboration_vs_trust,
+         reads=('regulation_status', COLLABORATION, TRUST, MARKET_SHARE), plots=True),
+    Task('chart_content_volume', visualize_content_volume_by_country_year, reads=('country', 'year', CONTENT_VOLUME), plots=True),
+    Task('chart_regulation_impact', visualize_regulation_impact, reads=('regulation_status', ADOPTION, JOB_LOSS, REVENUE, TRUST), plots=True),
+    Task('analyze_adoption_revenue', analyze_adoption_revenue_relationship,
+         reads=('country', 'industry', ADOPTION, REVENUE)),
+    Task('analyze_job_displacement', analyze_job_displacement_vs_collaboration,
+         reads=('industry', ADOPTION, JOB_LOSS, COLLABORATION)),
+    Task('analyze_regulation', analyze_regulation_impact, reads=('regulation_status', 'top_ai_tools_used') + METRIC_COLUMNS),
+    Task('analyze_time_trends', analyze_time_trends, reads=('year', 'top_ai_tools_used') + METRIC_COLUMNS),
+    Task('analyze_industry_patterns', analyze_industry_patterns,
+         reads=('industry', 'top_ai_tools_used', CONTENT_VOLUME) + METRIC_COLUMNS),
+]
+
+# Charts that can be rendered on demand, by name (e.g. 'regulation_impact')
+CHARTS = {task.name[len('chart_'):]: task.func for task in PIPELINE_TASKS if task.plots}
+
+def render_chart(name, df, fmt='png', width=None, height=None):
+    """
+    Render one chart into memory instead of the 'visualizations' folder.
+    
+    Parameters:
+    name (str): Key of CHARTS
+    df (pd.DataFrame): Data to plot (already filtered)
+    fmt (str): 'png', 'svg' or 'webp'
+    width, height (int): Size in pixels; with only a width the chart keeps its
+                         own aspect ratio
+    
+    Returns:
+    bytes: The encoded image
+    """
+    load_plotting()
+    buffer = io.BytesIO()
+    
+    def to_buffer(fig):
+        fig_width, fig_height = fig.get_size_inches()
+        dpi = 100
+        if width and height:
+            fig.set_size_inches(width / dpi, height / dpi)
+            fig.tight_layout()
+        elif width:
+            dpi = width / fig_width
+        fig.savefig(buffer, format=fmt, dpi=dpi)
+    
+    try:
+        CHARTS[name](df, output=to_buffer)
+    finally:
+        # Some charts open a second figure (DataFrame.plot); never leave any behind
+        plt.close('all')
+    return buffer.getvalue()
+
+# ===============================================================
+# PART 6: MAIN FUNCTION
 # ===============================================================
 
+def parse_args():
+    """Parse the command line options for the analysis pipeline."""
+    parser = argparse.ArgumentParser(description="Global AI content impact analysis")
+    parser.add_argument(
+        'file_path',
+        nargs='?',
+        default=r'C:\Users\vinee\OneDrive\Documents\Github\tech501-preassignment\Data Pathway notes\Global_AI_Content_Impact_Dataset.csv',
+        help="Path to the dataset CSV, or a directory partitioned by year=/country="
+    )
+    parser.add_argument(
+        '--analysis-only',
+        action='store_true',
+        help="Headless text analysis only; skips the charts and never imports matplotlib/seaborn"
+    )
+    parser.add_argument(
+        '--steps',
+        nargs='+',
+        metavar='STEP',
+        help="Run only these pipeline steps (plus the steps they depend on), e.g. analyze_regulation chart_regulation_impact"
+    )
+    parser.add_argument(
+        '--years',
+        nargs='+',
+        type=int,
+        help="Only analyse these years (skips the other year= partitions of a dataset directory)"
+    )
+    parser.add_argument(
+        '--countries',
+        nargs='+',
+        help="Only analyse these countries (skips the other country= partitions of a dataset directory)"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help="Number of worker processes for independent steps (default: 1, run in order)"
+    )
+    return parser.parse_args()
+
+def run_pipeline(df, steps=None, workers=1, analysis_only=False):
+    """
+    Run the selected pipeline steps through the task graph.
+    
+    Parameters:
+    df (pd.DataFrame): Cleaned dataframe
+    steps (list): Step names to run, or None for every step
+    workers (int): Number of worker processes
+    analysis_only (bool): Drop the chart steps
+    
+    The report starts with a "Running pipeline steps" line followed by the
+    output of each step; the CREATING VISUALIZATIONS and ADVANCED ANALYSIS
+    section headers of a full run are not printed.
+    
+    Returns:
+    pd.DataFrame: The dataframe plus any columns a step declares in `produces`
+                  (none of PIPELINE_TASKS does today, so the columns are unchanged)
+    """
+    tasks = select_tasks(PIPELINE_TASKS, steps)
+    if analysis_only:
+        tasks = [task for task in tasks if not task.plots]
+    
+    if any(task.plots for task in tasks) and not os.path.exists('visualizations'):
+        os.makedirs('visualizations')
+        print("Created 'visualizations' directory to save the charts")
+    
+    print(f"\nRunning pipeline steps: {', '.join(task.name for task in tasks)}")
+    return run_tasks(df, tasks, workers=workers)
+
 def main():
     """
     Main function to run the entire analysis pipeline.
     """
-    # Your specific file path
-    file_path = r'C:\Users\vinee\OneDrive\Documents\Github\tech501-preassignment\Data Pathway notes\Global_AI_Content_Impact_Dataset.csv'
+    args = parse_args()
+    file_path = args.file_path
     
     print("\n" + "="*50)
     print("GLOBAL AI CONTENT IMPACT ANALYSIS")
     print("="*50)
     print(f"\nAnalyzing data from: {file_path}")
     
+    # With --steps only the columns those steps (and their upstream steps) read are loaded
+    columns = None
+    if args.steps:
+        try:
+            tasks = select_tasks(PIPELINE_TASKS, args.steps)
+        except ValueError as e:
+            print(f"\nError: {str(e)}")
+            return
+        produced = {column for task in tasks for column in task.produces}
+        columns = {column for task in tasks for column in task.reads} - produced
+    
     # Load and clean data
-    df = load_and_clean_data(file_path)
+    df = load_and_clean_data(file_path, args.years, args.countries, columns)
     
     if df is None:
         print("\nError: Unable to proceed with analysis due to issues with the dataset.")
         return
     
-    # Perform exploratory data analysis
-    perform_eda(df)
-    
-    # Create visualizations
-    create_visualizations(df)
-    
-    # Perform advanced analysis
-    perform_advanced_analysis(df)
+    if args.steps or args.workers > 1:
+        # Run through the task graph: selected steps only, independent ones in parallel
+        try:
+            run_pipeline(df, args.steps, args.workers, args.analysis_only)
+        except ValueError as e:
+            print(f"\nError: {str(e)}")
+            return
+    else:
+        # Perform exploratory data analysis
+        perform_eda(df)
+        
+        # Create visualizations (skipped in the headless analysis-only mode)
+        if not args.analysis_only:
+            create_visualizations(df)
+        
+        # Perform advanced analysis
+        perform_advanced_analysis(df)
     
     print("\n" + "="*50)
     print("ANALYSIS COMPLETE")
     print("="*50)
-    print("\nAll analyses and visualizations have been successfully completed.")
-    print("Visualizations are saved in the 'visualizations' folder.")
+    if args.analysis_only:
+        print("\nAll analyses have been successfully completed (charts skipped).")
+    else:
+        print("\nAll analyses and visualizations have been successfully completed.")
+        print("Visualizations are saved in the 'visualizations' folder.")
 
 # Run the main function
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+import io
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import redirect_stdout
+from typing import Callable, NamedTuple, Tuple
+
+# ===============================================================
+# DEPENDENCY-GRAPH TASK RUNNER FOR THE ANALYSIS PIPELINE
+# ===============================================================
+
+class Task(NamedTuple):
+    """
+    One step of the analysis pipeline.
+
+    name (str): Name used to select the step on the command line
+    func (callable): Function called with a dataframe holding only `reads`
+    reads (tuple): Columns the step reads
+    produces (tuple): Derived columns the step adds to its frame
+    plots (bool): True if the step renders a chart
+    """
+    name: str
+    func: Callable
+    reads: Tuple[str, ...]
+    produces: Tuple[str, ...] = ()
+    plots: bool = False
+
+def build_dependencies(tasks):
+    """
+    Work out which tasks each task has to wait for.
+
+    A task depends on every task that produces one of the columns it reads.
+
+    Returns:
+    dict: Task name -> set of upstream task names
+    """
+    producers = {}
+    for task in tasks:
+        for column in task.produces:
+            if column in producers:
+                raise ValueError(f"Column '{column}' is produced by both '{producers[column]}' and '{task.name}'")
+            producers[column] = task.name
+
+    return {
+        task.name: {producers[column] for column in task.reads if column in producers}
+        for task in tasks
+    }
+
+def select_tasks(tasks, names):
+    """
+    Keep only the named tasks plus everything upstream of them.
+
+    Parameters:
+    tasks (list): All pipeline tasks
+    names (list): Names of the tasks that were asked for (None keeps all)
+
+    Returns:
+    list: Selected tasks in their original order
+    """
+    if not names:
+        return list(tasks)
+
+    known = {task.name for task in tasks}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"Unknown step(s): {', '.join(unknown)}. Available: {', '.join(sorted(known))}")
+
+    dependencies = build_dependencies(tasks)
+    needed = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(dependencies[name])
+
+    return [task for task in tasks if task.name in needed]
+
+def _run_task(func, frame, produces):
+    """Run one task on its own frame, capturing what it prints."""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        func(frame)
+    produced = frame[list(produces)] if produces else None
+    return output.getvalue(), produced
+
+def run_tasks(df, tasks, workers=1):
+    """
+    Run the tasks in dependency order, running independent tasks concurrently.
+
+    Each task only gets a copy of the columns it declared in `reads`, so it can
+    never mutate the shared dataframe. Columns listed in `produces` are merged
+    back into the shared frame once the task finishes. Printed output is
+    replayed in the order the tasks were declared, so the report reads the same
+    however many workers are used.
+
+    Parameters:
+    df (pd.DataFrame): Cleaned dataframe
+    tasks (list): Tasks to run (see select_tasks)
+    workers (int): Number of worker processes; 1 runs everything in-process
+
+    Returns:
+    pd.DataFrame: A new dataframe with the produced columns added
+    """
+    dependencies = build_dependencies(tasks)
+    by_name = {task.name: task for task in tasks}
+    order = [task.name for task in tasks]
+    done = set()
+    outputs = {}
+    printed = 0
+
+    def frame_for(task):
+        return df[list(task.reads)].copy()
+
+    def finish(name, result):
+        nonlocal df, printed
+        outputs[name], produced = result
+        if produced is not None:
+            df = df.assign(**{column: produced[column] for column in produced.columns})
+        done.add(name)
+        # Print every finished task whose predecessors (in declared order) are printed
+        while printed < len(order) and order[printed] in done:
+            print(outputs.pop(order[printed]), end="")
+            printed += 1
+
+    def ready():
+        return [
+            name for name in order
+            if name not in done and name not in running and dependencies[name] <= done
+        ]
+
+    def next_batch():
+        batch = ready()
+        if not batch and not running:
+            stuck = [name for name in order if name not in done]
+            raise ValueError(f"Circular column dependencies between steps: {', '.join(stuck)}")
+        return batch
+
+    running = {}
+    if workers <= 1:
+        while len(done) < len(order):
+            for name in next_batch():
+                task = by_name[name]
+                finish(name, _run_task(task.func, frame_for(task), task.produces))
+        return df
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while len(done) < len(order):
+            for name in next_batch():
+                task = by_name[name]
+                running[name] = executor.submit(_run_task, task.func, frame_for(task), task.produces)
+
+            finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+            for name in [name for name, future in running.items() if future in finished]:
+                finish(name, running.pop(name).result())
+
+    return df
@@ -0,0 +1,109 @@
+import gzip
+import io
+import json
+import os
+from datetime import datetime, timezone
+from glob import glob
+
+# Raw OpenWeather responses are kept as newline-delimited JSON, one compressed
+# segment per extract run, in one folder per UTC day:
+#   archive/date=2026-10-19/segment-101500-1234.ndjson.gz
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+from transform import loads
+
+def _encode(entry):
+    # Raw response bodies are archived as received; decoded dicts are re-encoded
+    if isinstance(entry, bytes):
+        return entry.replace(b"\n", b" ").strip()
+    return json.dumps(entry, separators=(",", ":")).encode("utf-8")
+
+def _open_segment(path, mode):
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path} needs the 'zstandard' package")
+        stream = zstandard.open(path, mode)
+        # The zstd reader is unbuffered and can't be iterated line by line
+        return io.BufferedReader(stream, 1 << 20) if mode == "rb" else stream
+    return gzip.open(path, mode)
+
+def archive_responses(raw_data, archive_dir=None, fetched_at=None):
+    """
+    Append the raw API responses (bytes bodies or decoded dicts) to the
+    archive as a new compressed segment.
+
+    Segments are never rewritten, so archiving is append-only. Uses zstd when
+    the 'zstandard' package is installed and gzip otherwise.
+
+    Returns:
+    str: Path of the written segment, or None if there was nothing to write
+    """
+    if not raw_data:
+        return None
+    archive_dir = archive_dir or ARCHIVE_DIR
+    fetched_at = fetched_at or datetime.now(timezone.utc)
+    partition = os.path.join(archive_dir, f"date={fetched_at:%Y-%m-%d}")
+    os.makedirs(partition, exist_ok=True)
+
+    extension = "zst" if zstandard is not None else "gz"
+    name = f"segment-{fetched_at:%H%M%S%f}-{os.getpid()}.ndjson.{extension}"
+    path = os.path.join(partition, name)
+    # Written under a hidden name and renamed once complete, so a replay
+    # never picks up a half-written segment
+    tmp_path = os.path.join(partition, "." + name)
+    with _open_segment(tmp_path, "wb") as segment:
+        segment.write(b"".join(_encode(entry) + b"\n" for entry in raw_data))
+    os.replace(tmp_path, path)
+    return path
+
+def list_segments(archive_dir=None, start=None, end=None):
+    """
+    List archived segments in time order, optionally only for days in [start, end].
+
+    Parameters:
+    start, end (str): Inclusive 'YYYY-MM-DD' bounds; partitions outside are skipped unread
+    """
+    archive_dir = archive_dir or ARCHIVE_DIR
+    segments = []
+    for partition in sorted(glob(os.path.join(archive_dir, "date=*"))):
+        day = os.path.basename(partition)[len("date="):]
+        if (start and day < start) or (end and day > end):
+            continue
+        segments += sorted(
+            glob(os.path.join(partition, "segment-*.ndjson.gz")) +
+            glob(os.path.join(partition, "segment-*.ndjson.zst"))
+        )
+    return segments
+
+def read_segment_lines(paths):
+    """Stream the raw response bodies stored in the given segments, as bytes."""
+    for path in paths:
+        with _open_segment(path, "rb") as segment:
+            for line in segment:
+                if line.strip():
+                    yield line
+
+def read_segments(paths):
+    """Stream the raw responses stored in the given segments one dict at a time."""
+    for line in read_segment_lines(paths):
+        yield loads(line)
+
+def iter_archived(archive_dir=None, start=None, end=None):
+    """Stream every archived raw response for days in [start, end]."""
+    return read_segments(list_segments(archive_dir, start, end))
+
+def iter_batches(records, batch_size):
+    """Group an iterable of records into lists of at most batch_size."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,68 @@
+"""
+Microbenchmark: dict decode + transform_data vs. the raw-bytes columnar path.
+
+    python bench_transform.py                 # synthetic payloads from a recorded response
+    python bench_transform.py --archive       # payloads recorded in ARCHIVE_DIR
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from archive import list_segments, read_segment_lines
+import transform
+from transform import columns_from_payloads, transform_columns, transform_data
+
+# A recorded OpenWeather /data/2.5/weather response (metric units)
+RECORDED_RESPONSE = (
+    b'{"coord":{"lon":-0.1257,"lat":51.5085},"weather":[{"id":803,"main":"Clouds",'
+    b'"description":"broken clouds","icon":"04d"}],"base":"stations","main":{"temp":14.21,'
+    b'"feels_like":13.72,"temp_min":13.07,"temp_max":15.11,"pressure":1012,"humidity":79,'
+    b'"sea_level":1012,"grnd_level":1008},"visibility":10000,"wind":{"speed":5.66,"deg":240},'
+    b'"clouds":{"all":75},"dt":1760868000,"sys":{"type":2,"id":2075535,"country":"GB",'
+    b'"sunrise":1760855262,"sunset":1760892610},"timezone":3600,"id":2643743,"name":"London","cod":200}'
+)
+CITIES = [b"London", b"New York", b"Tokyo", b"Mumbai", b"Sydney"]
+
+def synthetic_payloads(count):
+    # Vary the city and timestamp so drop_duplicates keeps every record
+    return [
+        RECORDED_RESPONSE.replace(b'"London"', b'"' + CITIES[i % 5] + b'"')
+                         .replace(b"1760868000", str(1760868000 + i).encode())
+        for i in range(count)
+    ]
+
+def measure(label, func, payloads):
+    # Timed and memory-traced in separate runs, since tracing slows allocation down
+    started = time.perf_counter()
+    df = func(payloads)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    func(payloads)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed / len(payloads) * 1e6:6.2f} us/record   "
+          f"peak {peak / len(payloads):6.0f} B/record   ({len(df)} rows)")
+
+def dict_path(payloads):
+    return transform_data([json.loads(payload) for payload in payloads])
+
+def columnar_path(payloads):
+    return transform_columns(columns_from_payloads(payloads))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--archive", action="store_true", help="Use the payloads recorded in the archive")
+    args = parser.parse_args()
+
+    if args.archive:
+        payloads = list(read_segment_lines(list_segments()))
+    else:
+        payloads = synthetic_payloads(args.records)
+    print(f"{len(payloads)} payloads")
+    measure("json.loads + transform_data", dict_path, payloads)
+    if transform.msgspec is not None:
+        measure("bytes -> columns (msgspec)", columnar_path, payloads)
+        # Same path with whole responses decoded, as when msgspec is not installed
+        transform.msgspec = None
+    measure("bytes -> columns (loads)", columnar_path, payloads)
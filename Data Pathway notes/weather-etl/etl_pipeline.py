@@ -1,21 +1,191 @@
-from extract import extract_data
-from transform import transform_data
+import argparse
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from extract import extract_raw
+from transform import columns_from_payloads, transform_columns
 from load import load_data
+from rolling import add_rolling_features, commit_state, describe_anomalies, get_state
+from archive import archive_responses, iter_batches, list_segments, read_segment_lines
 
-def run_etl():
-    cities = ["London", "New York", "Tokyo", "Mumbai", "Sydney"]
+CITIES = ["London", "New York", "Tokyo", "Mumbai", "Sydney"]
+
+# Held by every ETL process (one-off run, replay or daemon) while it runs
+LOCK_PATH = "etl.lock"
+
+def run_etl(cities=None):
+    cities = cities or CITIES
 
     print("🔍 Extracting data...")
-    raw = extract_data(cities)
+    raw = extract_raw(cities)
     print(f"✅ Extracted data for {len(raw)} cities.")
 
+    segment = archive_responses(raw)
+    if segment:
+        print(f"🗄️ Archived raw responses to {segment}")
+
     print("🧹 Transforming data...")
-    clean = transform_data(raw)
+    clean = transform_columns(columns_from_payloads(raw))
     print(f"✅ Transformed data: {clean.shape[0]} rows.")
 
+    if clean.empty:
+        print("⚠️ Nothing to load.")
+        return
+
+    # The batch is applied to a copy of the rolling state, which only replaces
+    # the current state once the load succeeded; after a failed load the same
+    # observations are fetched and counted again in the next cycle
+    state = get_state().copy()
+    clean = add_rolling_features(clean, state)
+    for alert in describe_anomalies(clean):
+        print(f"🚨 Anomaly: {alert}")
+
     print("📦 Loading data into MySQL...")
     load_data(clean)
+    commit_state(state)
     print("✅ ETL process completed!")
 
+def acquire_run_lock(path):
+    """
+    Take an exclusive lock on `path` so two ETL processes (e.g. the daemon and a
+    leftover cron job) never run cycles at the same time.
+
+    Returns:
+    file: The open lock file (keep it open to hold the lock), or None if
+          another process holds it. Without fcntl (Windows) no lock is taken.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return open(path, "a")
+    lock_file = open(path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+def run_daemon(default_interval=300, city_intervals=None):
+    """
+    Keep running ETL cycles in one long-lived process.
+
+    The HTTP session, the database engine/pool and the schema checks are created
+    once and stay warm, so a cycle only pays for the fetches and the write.
+    Each city is refreshed on its own interval; the cities that are due are
+    fetched together in one cycle. Cycles run one after another, never
+    overlapping; if a cycle runs late, missed refreshes are not queued up.
+    SIGTERM/SIGINT stop the daemon after the current cycle. The caller holds
+    the run lock (see acquire_run_lock) for the whole time.
+
+    Parameters:
+    default_interval (int): Seconds between refreshes of a city
+    city_intervals (dict): City -> seconds, overriding the default for that city
+    """
+    city_intervals = city_intervals or {}
+    cities = CITIES + [city for city in city_intervals if city not in CITIES]
+    intervals = {city: city_intervals.get(city, default_interval) for city in cities}
+
+    stop = threading.Event()
+    def request_stop(signum, frame):
+        print("🛑 Stop requested, finishing the current cycle...")
+        stop.set()
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    print(f"🕒 ETL daemon started for {len(cities)} cities")
+    next_due = {city: 0.0 for city in cities}
+    while not stop.is_set():
+        now = time.monotonic()
+        due = [city for city in cities if next_due[city] <= now]
+        if due:
+            try:
+                run_etl(due)
+            except Exception as e:
+                # Keep the daemon alive; the cities are retried on their next interval
+                print(f"⚠️ ETL cycle failed: {e}")
+            finished = time.monotonic()
+            for city in due:
+                next_due[city] = finished + intervals[city]
+        stop.wait(max(0.0, min(next_due.values()) - time.monotonic()))
+    print("👋 ETL daemon stopped")
+
+def parse_city_intervals(values):
+    """Turn ["London=60", "Tokyo=600"] into {"London": 60, "Tokyo": 600}."""
+    intervals = {}
+    for value in values or []:
+        city, _, seconds = value.rpartition("=")
+        intervals[city] = int(seconds)
+    return intervals
+
+def transform_payloads(payloads):
+    return transform_columns(columns_from_payloads(payloads))
+
+def replay_etl(start=None, end=None, batch_size=50000, workers=1):
+    """
+    Re-run transform and load over archived raw responses, without calling the API.
+
+    Parameters:
+    start, end (str): Inclusive 'YYYY-MM-DD' range of archive days (default: all)
+    batch_size (int): Records transformed and loaded per batch
+    workers (int): Processes decoding and transforming batches in parallel;
+                   loading stays in this process, in archive order
+    """
+    print(f"⏪ Replaying archived responses ({start or 'start'} → {end or 'end'})...")
+    started = time.perf_counter()
+    total = 0
+    batches = iter_batches(read_segment_lines(list_segments(start=start, end=end)), batch_size)
+
+    def load(clean):
+        nonlocal total
+        load_data(clean)
+        total += len(clean)
+        print(f"📦 Loaded {total} records")
+
+    if workers > 1:
+        # At most 2 * workers batches are queued or waiting to be loaded, so
+        # memory stays bounded however large the archive is
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for batch in batches:
+                pending.append(executor.submit(transform_payloads, batch))
+                if len(pending) >= 2 * workers:
+                    load(pending.popleft().result())
+            while pending:
+                load(pending.popleft().result())
+    else:
+        for batch in batches:
+            load(transform_payloads(batch))
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else 0
+    print(f"✅ Replay completed: {total} records in {elapsed:.1f}s ({rate:,.0f} records/s)")
+
 if __name__ == "__main__":
-    run_etl()
+    parser = argparse.ArgumentParser(description="Weather ETL pipeline")
+    parser.add_argument("--replay", action="store_true", help="Transform and load archived responses instead of calling the API")
+    parser.add_argument("--since", help="First archive day to replay (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Last archive day to replay (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Records per replay batch")
+    parser.add_argument("--workers", type=int, default=1, help="Processes decoding archive batches during replay")
+    parser.add_argument("--daemon", action="store_true", help="Keep running and refresh the cities on a schedule")
+    parser.add_argument("--interval", type=int, default=300, help="Seconds between refreshes of each city in --daemon mode")
+    parser.add_argument("--city-interval", action="append", metavar="CITY=SECONDS",
+                        help="Per-city refresh interval for --daemon (repeatable); unknown cities are added")
+    args = parser.parse_args()
+
+    # Every mode takes the lock, so a cron run, a replay and the daemon never overlap
+    lock_file = acquire_run_lock(LOCK_PATH)
+    if lock_file is None:
+        print(f"⚠️ Another ETL process holds {LOCK_PATH}; not starting.")
+        raise SystemExit(1)
+    try:
+        if args.replay:
+            replay_etl(args.since, args.until, args.batch_size, args.workers)
+        elif args.daemon:
+            run_daemon(args.interval, parse_city_intervals(args.city_interval))
+        else:
+            run_etl()
+    finally:
+        lock_file.close()
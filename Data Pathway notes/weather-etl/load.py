@@ -1,17 +1,58 @@
 import os
 from sqlalchemy import create_engine
 from dotenv import load_dotenv
+from schema import (
+    bump_version, ensure_schema, ensure_month_partitions, insert_features, insert_ignore, refresh_rollups
+)
 
 load_dotenv()
 
+# Where each batch is written: "db" (MySQL, or DB_URL) and/or "parquet" (the
+# columnar warehouse for analytical reads, see warehouse.py), e.g. SINKS=db,parquet
+SINKS = [sink.strip() for sink in os.getenv("SINKS", "db").split(",") if sink.strip()]
+
+_engine = None
+_schemas = {}
+
 def get_engine():
+    # The engine (and its connection pool) is created once and reused by every load
+    global _engine
+    if _engine is None:
+        _engine = create_engine(database_url(), pool_pre_ping=True)
+    return _engine
+
+def get_schema(engine, table_name="weather"):
+    # Tables are only checked/created the first time a load uses them
+    key = (engine, table_name)
+    if key not in _schemas:
+        _schemas[key] = ensure_schema(engine, table_name)
+    return _schemas[key]
+
+def database_url():
+    # DB_URL overrides the MySQL settings, e.g. DB_URL=sqlite:///weather.db for local testing
+    url = os.getenv("DB_URL")
+    if url:
+        return url
     user = os.getenv("DB_USER")
     password = os.getenv("DB_PASSWORD")
     host = os.getenv("DB_HOST")
     port = os.getenv("DB_PORT")
     db = os.getenv("DB_NAME")
-    return create_engine(f"mysql+mysqlconnector://{user}:{password}@{host}:{port}/{db}")
+    return f"mysql+mysqlconnector://{user}:{password}@{host}:{port}/{db}"
 
-def load_data(df, table_name="weather"):
-    engine = get_engine()
-    df.to_sql(table_name, con=engine, if_exists='append', index=False)
+def load_data(df, table_name="weather", engine=None, sinks=None):
+    sinks = sinks or SINKS
+    if "db" in sinks:
+        engine = engine or get_engine()
+        raw, rollups, version, features = get_schema(engine, table_name)
+        with engine.begin() as conn:
+            ensure_month_partitions(conn, table_name, df["timestamp"])
+            # The rolling statistics (if any) go to their own table
+            insert_ignore(conn, raw, df[[column.name for column in raw.columns]].to_dict(orient="records"))
+            insert_features(conn, features, df)
+            refresh_rollups(conn, raw, rollups, df)
+            bump_version(conn, version)
+    if "parquet" in sinks:
+        # pyarrow is only needed when the warehouse sink is enabled
+        from warehouse import write_batch
+        write_batch(df, table_name)
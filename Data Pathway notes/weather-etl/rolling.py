@@ -0,0 +1,188 @@
+import copy
+import os
+import numpy as np
+
+# Per-city rolling statistics, updated record by record between transform and
+# load. The state of every city lives in a few NumPy arrays (one row per city)
+# and is saved to ROLLING_STATE after each successful load, so alerts never
+# need a query over the history in the database.
+ROLLING_STATE = os.getenv("ROLLING_STATE", "rolling_state.npz")
+WINDOW = int(os.getenv("ROLLING_WINDOW", 24))          # observations per moving window
+EWMA_ALPHA = float(os.getenv("EWMA_ALPHA", 0.2))
+ANOMALY_Z = float(os.getenv("ANOMALY_Z", 4.0))
+MIN_SAMPLES = 6  # no anomaly flags until a city has this many observations
+
+METRICS = ["temperature", "humidity", "pressure"]
+# Smallest spread used for z-scores, so a flat window (e.g. a constant
+# pressure) doesn't turn a change of one unit into an anomaly
+MIN_STD = np.array([0.5, 2.0, 1.0])
+
+_state = None
+
+class RollingState:
+    """
+    Moving average, rolling standard deviation and EWMA of each metric over the
+    last `window` observations of every city.
+
+    The window is a ring buffer and its mean/variance are updated when a value
+    enters and the oldest leaves (Welford), so one update costs the same
+    however long the window is.
+    """
+
+    ARRAYS = ("values", "mean", "m2", "ewma", "count", "position", "last_timestamp")
+
+    def __init__(self, window=WINDOW, alpha=EWMA_ALPHA, capacity=8):
+        self.window = window
+        self.alpha = alpha
+        self.cities = {}
+        metrics = len(METRICS)
+        self.values = np.zeros((capacity, window, metrics))
+        self.mean = np.zeros((capacity, metrics))
+        self.m2 = np.zeros((capacity, metrics))
+        self.ewma = np.zeros((capacity, metrics))
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.position = np.zeros(capacity, dtype=np.int64)
+        self.last_timestamp = np.full(capacity, np.iinfo(np.int64).min)
+
+    def _index(self, city):
+        index = self.cities.get(city)
+        if index is None:
+            index = self.cities[city] = len(self.cities)
+            if index == len(self.count):
+                # Double the capacity; new rows start empty
+                for name in self.ARRAYS:
+                    array = getattr(self, name)
+                    setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+                self.last_timestamp[index:] = np.iinfo(np.int64).min
+        return index
+
+    def update(self, city, timestamp, x):
+        """
+        Add one observation (x holds the METRICS values) of a city.
+
+        Returns:
+        tuple: (z-scores against the window before this observation, moving
+        average, rolling std, EWMA), or None if the observation is not newer
+        than the last one seen for the city
+        """
+        i = self._index(city)
+        if timestamp <= self.last_timestamp[i]:
+            return None
+        n = self.count[i]
+        mean = self.mean[i].copy()
+        std = np.sqrt(self.m2[i] / (n - 1)) if n > 1 else np.full(len(METRICS), np.nan)
+        z = (x - mean) / np.fmax(std, MIN_STD) if n >= MIN_SAMPLES else np.full(len(METRICS), np.nan)
+
+        position = self.position[i]
+        if n < self.window:
+            n = self.count[i] = n + 1
+            delta = x - mean
+            self.mean[i] = mean + delta / n
+            self.m2[i] += delta * (x - self.mean[i])
+        else:
+            old = self.values[i, position]
+            self.mean[i] = mean + (x - old) / n
+            self.m2[i] += (x - old) * (x - self.mean[i] + old - mean)
+        np.maximum(self.m2[i], 0, out=self.m2[i])
+        self.values[i, position] = x
+        self.position[i] = (position + 1) % self.window
+        self.ewma[i] = x if n == 1 else self.alpha * x + (1 - self.alpha) * self.ewma[i]
+        self.last_timestamp[i] = timestamp
+
+        rolling_std = np.sqrt(self.m2[i] / (n - 1)) if n > 1 else np.full(len(METRICS), np.nan)
+        return z, self.mean[i].copy(), rolling_std, self.ewma[i].copy()
+
+    def copy(self):
+        """Independent copy, so a batch can be applied without touching this state."""
+        state = copy.copy(self)
+        state.cities = dict(self.cities)
+        for name in self.ARRAYS:
+            setattr(state, name, getattr(self, name).copy())
+        return state
+
+    def save(self, path=None):
+        path = path or ROLLING_STATE
+        directory, name = os.path.split(os.path.abspath(path))
+        tmp_path = os.path.join(directory, "." + name)
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f, cities=np.array(list(self.cities), dtype=str),
+                window=self.window, alpha=self.alpha,
+                **{name: getattr(self, name) for name in self.ARRAYS}
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=None, window=WINDOW, alpha=EWMA_ALPHA):
+        """Load a saved state, or start empty if there is none or its window/alpha differ."""
+        path = path or ROLLING_STATE
+        state = cls(window, alpha)
+        if not os.path.exists(path):
+            return state
+        with np.load(path) as saved:
+            if int(saved["window"]) != window or float(saved["alpha"]) != alpha:
+                print(f"⚠️ {path} was saved with other window/alpha settings, starting fresh")
+                return state
+            state.cities = {str(city): index for index, city in enumerate(saved["cities"])}
+            for name in cls.ARRAYS:
+                setattr(state, name, saved[name])
+        return state
+
+def get_state():
+    # Loaded once per process, so the daemon keeps it in memory between cycles
+    global _state
+    if _state is None:
+        _state = RollingState.load()
+    return _state
+
+def commit_state(state):
+    """Make `state` the current state and save it; call once its batch is loaded."""
+    global _state
+    _state = state
+    state.save()
+
+def add_rolling_features(df, state=None):
+    """
+    Update the rolling state with a transformed batch and return the batch with
+    <metric>_ma, <metric>_std, <metric>_ewma, <metric>_z and <metric>_anomaly
+    columns plus an overall `anomaly` flag.
+
+    Rows are applied in timestamp order. Rows that are not newer than what the
+    state has already seen for their city (repeated polls, replays) leave the
+    state unchanged and get empty statistics and no flags.
+
+    `state` is updated in place; pass get_state().copy() and commit_state() it
+    after the load, so a failed load leaves the current state untouched.
+    """
+    state = state or get_state()
+    n = len(df)
+    z, ma, std, ewma = (np.full((n, len(METRICS)), np.nan) for _ in range(4))
+    cities = df["city"].to_numpy()
+    timestamps = df["timestamp"].to_numpy("datetime64[s]").astype(np.int64)
+    values = df[METRICS].to_numpy(dtype=float)
+
+    for row in np.argsort(timestamps, kind="stable"):
+        result = state.update(cities[row], timestamps[row], values[row])
+        if result is not None:
+            z[row], ma[row], std[row], ewma[row] = result
+
+    df = df.copy()
+    flags = np.abs(z) > ANOMALY_Z  # NaN compares False
+    for m, metric in enumerate(METRICS):
+        df[f"{metric}_ma"] = ma[:, m]
+        df[f"{metric}_std"] = std[:, m]
+        df[f"{metric}_ewma"] = ewma[:, m]
+        df[f"{metric}_z"] = z[:, m]
+        df[f"{metric}_anomaly"] = flags[:, m]
+    df["anomaly"] = flags.any(axis=1)
+    return df
+
+def describe_anomalies(df):
+    """One alert line per flagged metric of every anomalous row."""
+    for row in df[df["anomaly"]].itertuples(index=False):
+        for metric in METRICS:
+            if getattr(row, f"{metric}_anomaly"):
+                yield (
+                    f"{row.city} {row.timestamp}: {metric} {getattr(row, metric):g} "
+                    f"(moving avg {getattr(row, f'{metric}_ma'):.1f}, z={getattr(row, f'{metric}_z'):+.1f})"
+                )
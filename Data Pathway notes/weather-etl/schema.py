@@ -0,0 +1,240 @@
+from datetime import datetime, timezone
+import pandas as pd
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, Index, Integer, MetaData, String, Table, inspect, select, text, and_
+)
+from sqlalchemy.dialects import mysql, sqlite
+
+# Metrics summarised in the rollup tables
+ROLLUP_METRICS = ["temperature", "humidity", "pressure"]
+
+# Rollup table suffix -> pandas frequency used to bucket the timestamps
+ROLLUP_LEVELS = {"hourly": "h", "daily": "D"}
+
+def weather_table(metadata, table_name="weather"):
+    """Raw observations: one row per city per timestamp."""
+    return Table(
+        table_name, metadata,
+        Column("city", String(100), primary_key=True),
+        Column("timestamp", DateTime, primary_key=True),
+        Column("temperature", Float),
+        Column("humidity", Integer),
+        Column("pressure", Integer),
+        Column("weather", String(100)),
+        # The (city, timestamp) primary key serves per-city time-range
+        # queries; this index serves "all cities over a period" queries
+        Index(f"ix_{table_name}_timestamp", "timestamp"),
+        mysql_engine="InnoDB",
+        extend_existing=True,
+    )
+
+def rollup_table(metadata, table_name="weather", level="hourly"):
+    """Per-city min/max/avg of each metric over an hour or a day."""
+    columns = [
+        Column("city", String(100), primary_key=True),
+        Column("bucket_start", DateTime, primary_key=True),
+        Column("samples", Integer, nullable=False),
+    ]
+    for metric in ROLLUP_METRICS:
+        columns += [
+            Column(f"{metric}_min", Float),
+            Column(f"{metric}_max", Float),
+            Column(f"{metric}_avg", Float),
+        ]
+    return Table(f"{table_name}_{level}", metadata, *columns, mysql_engine="InnoDB", extend_existing=True)
+
+def version_table(metadata, table_name="weather"):
+    """
+    One-row load counter, bumped by every load. Readers (e.g. the GCP API cache)
+    use it as the data version, since MAX(timestamp) misses late or backfilled rows.
+    """
+    return Table(
+        f"{table_name}_version", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=False),
+        Column("version", Integer, nullable=False),
+        Column("loaded_at", DateTime, nullable=False),
+        mysql_engine="InnoDB",
+        extend_existing=True,
+    )
+
+# Per-metric columns written by the rolling statistics stage (rolling.py)
+FEATURE_STATS = ["ma", "std", "ewma", "z"]
+
+def features_table(metadata, table_name="weather"):
+    """Rolling statistics and anomaly flags of each observation (see rolling.py)."""
+    columns = [
+        Column("city", String(100), primary_key=True),
+        Column("timestamp", DateTime, primary_key=True),
+    ]
+    for metric in ROLLUP_METRICS:
+        columns += [Column(f"{metric}_{stat}", Float) for stat in FEATURE_STATS]
+        columns.append(Column(f"{metric}_anomaly", Boolean, nullable=False))
+    columns.append(Column("anomaly", Boolean, nullable=False))
+    return Table(
+        f"{table_name}_features", metadata, *columns,
+        # Serves "recent anomalies across all cities" queries
+        Index(f"ix_{table_name}_features_anomaly", "anomaly", "timestamp"),
+        mysql_engine="InnoDB", extend_existing=True,
+    )
+
+def get_tables(table_name="weather"):
+    """Build the raw table and its rollup, version and features tables on a fresh MetaData."""
+    metadata = MetaData()
+    raw = weather_table(metadata, table_name)
+    rollups = {level: rollup_table(metadata, table_name, level) for level in ROLLUP_LEVELS}
+    version = version_table(metadata, table_name)
+    features = features_table(metadata, table_name)
+    return metadata, raw, rollups, version, features
+
+def month_partition_name(month_start):
+    return f"p{month_start:%Y%m}"
+
+def ensure_schema(engine, table_name="weather"):
+    """
+    Create the weather table and rollup tables if they don't exist yet.
+
+    On MySQL/MariaDB the raw table is also range partitioned by month on
+    `timestamp`, starting with a single catch-all partition that
+    ensure_month_partitions splits as new months arrive.
+
+    Returns:
+    tuple: (raw table, dict of rollup tables, version table, features table)
+    """
+    metadata, raw, rollups, version, features = get_tables(table_name)
+    existed = inspect(engine).has_table(table_name)
+    metadata.create_all(engine, checkfirst=True)
+
+    if engine.dialect.name in ("mysql", "mariadb") and not existed:
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE `{table_name}` PARTITION BY RANGE (TO_DAYS(`timestamp`)) "
+                f"(PARTITION p_future VALUES LESS THAN MAXVALUE)"
+            ))
+    return raw, rollups, version, features
+
+def ensure_month_partitions(conn, table_name, timestamps):
+    """
+    Make sure every month in `timestamps` has its own partition (MySQL/MariaDB only).
+
+    New months are split off the catch-all p_future partition. Rows older than
+    the first monthly partition simply land in it, so backfills still work.
+    """
+    if conn.dialect.name not in ("mysql", "mariadb") or len(timestamps) == 0:
+        return
+
+    existing = {
+        row[0] for row in conn.execute(text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+        ), {"table": table_name})
+    }
+    if "p_future" not in existing:
+        return  # table was created without partitioning (e.g. by an older to_sql)
+
+    latest = max((name for name in existing if name != "p_future"), default=None)
+    months = pd.to_datetime(pd.Series(timestamps)).dt.to_period("M").unique()
+    new_months = sorted(
+        month.to_timestamp() for month in months
+        if latest is None or month_partition_name(month.to_timestamp()) > latest
+    )
+    if not new_months:
+        return
+
+    partitions = ", ".join(
+        f"PARTITION {month_partition_name(month)} VALUES LESS THAN "
+        f"(TO_DAYS('{(month + pd.offsets.MonthBegin(1)):%Y-%m-%d}'))"
+        for month in new_months
+    )
+    conn.execute(text(
+        f"ALTER TABLE `{table_name}` REORGANIZE PARTITION p_future INTO "
+        f"({partitions}, PARTITION p_future VALUES LESS THAN MAXVALUE)"
+    ))
+
+def insert_ignore(conn, table, rows):
+    """Insert rows, skipping any that already exist for the same key."""
+    if not rows:
+        return
+    if conn.dialect.name == "sqlite":
+        statement = sqlite.insert(table).on_conflict_do_nothing()
+    else:
+        statement = table.insert().prefix_with("IGNORE")
+    conn.execute(statement, rows)
+
+def upsert(conn, table, rows):
+    """Insert rows, replacing the non-key columns of rows that already exist."""
+    if not rows:
+        return
+    keys = {column.name for column in table.primary_key}
+    if conn.dialect.name == "sqlite":
+        statement = sqlite.insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: statement.excluded[name] for name in rows[0] if name not in keys},
+        )
+    elif conn.dialect.name in ("mysql", "mariadb"):
+        statement = mysql.insert(table)
+        statement = statement.on_duplicate_key_update(
+            {name: statement.inserted[name] for name in rows[0] if name not in keys}
+        )
+    else:
+        for row in rows:
+            conn.execute(table.delete().where(and_(*(table.c[key] == row[key] for key in keys))))
+        statement = table.insert()
+    conn.execute(statement, rows)
+
+def compute_rollups(raw_df, freq):
+    """Aggregate raw rows into per-city buckets of the given pandas frequency."""
+    buckets = raw_df.assign(bucket_start=raw_df["timestamp"].dt.floor(freq))
+    rollup = buckets.groupby(["city", "bucket_start"]).agg(
+        samples=("timestamp", "size"),
+        **{
+            f"{metric}_{stat}": (metric, stat)
+            for metric in ROLLUP_METRICS
+            for stat in ("min", "max", "mean")
+        }
+    )
+    rollup.columns = [name.replace("_mean", "_avg") for name in rollup.columns]
+    return rollup.reset_index()
+
+def refresh_rollups(conn, raw, rollups, batch):
+    """
+    Recompute the hourly and daily buckets touched by `batch`.
+
+    The buckets are rebuilt from the raw table (a small (city, timestamp)
+    range read on the primary key) rather than incremented, so reloading
+    the same batch or a late row never double counts.
+    """
+    if batch.empty:
+        return
+    days = batch["timestamp"].dt.floor("D")
+    query = select(raw).where(and_(
+        raw.c.city.in_(batch["city"].unique().tolist()),
+        raw.c.timestamp >= days.min().to_pydatetime(),
+        raw.c.timestamp < (days.max() + pd.Timedelta(days=1)).to_pydatetime(),
+    ))
+    stored = pd.DataFrame(conn.execute(query).mappings().all())
+    stored["timestamp"] = pd.to_datetime(stored["timestamp"])
+
+    for level, freq in ROLLUP_LEVELS.items():
+        touched = set(zip(batch["city"], batch["timestamp"].dt.floor(freq)))
+        rollup = compute_rollups(stored, freq)
+        rollup = rollup[[key in touched for key in zip(rollup["city"], rollup["bucket_start"])]]
+        upsert(conn, rollups[level], rollup.to_dict(orient="records"))
+
+def bump_version(conn, version):
+    """Increment the load counter (inside the load's transaction)."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    updated = conn.execute(
+        version.update().where(version.c.id == 1).values(version=version.c.version + 1, loaded_at=now)
+    )
+    if updated.rowcount == 0:
+        conn.execute(version.insert().values(id=1, version=1, loaded_at=now))
+
+def insert_features(conn, features, batch):
+    """Store the rolling statistics of the rows in `batch` that have them."""
+    if "anomaly" not in batch.columns:
+        return
+    rows = batch.loc[batch[f"{ROLLUP_METRICS[0]}_ma"].notna(), [column.name for column in features.columns]]
+    # NaN (e.g. the std of a city's first observation) is stored as NULL
+    rows = rows.astype(object).where(rows.notna(), None)
+    insert_ignore(conn, features, rows.to_dict(orient="records"))
@@ -1,16 +1,98 @@
+import json
+import numpy as np
 import pandas as pd
 
-def transform_data(raw_data):
-    records = []
-    for entry in raw_data:
-        record = {
-            "city": entry["name"],
-            "timestamp": pd.to_datetime(entry["dt"], unit='s'),
-            "temperature": entry["main"]["temp"],
-            "humidity": entry["main"]["humidity"],
-            "pressure": entry["main"]["pressure"],
-            "weather": entry["weather"][0]["description"]
-        }
-        records.append(record)
-    df = pd.DataFrame(records)
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # orjson is optional; the standard json module also accepts bytes
+    loads = json.loads
+
+try:
+    import msgspec
+except ImportError:  # msgspec is optional; without it whole responses are decoded with loads
+    msgspec = None
+
+if msgspec is not None:
+    # Only these fields of a response are decoded; everything else in the
+    # body is skipped by the parser without building Python objects
+    class _Main(msgspec.Struct):
+        temp: float
+        humidity: float
+        pressure: float
+
+    class _Condition(msgspec.Struct):
+        description: str
+
+    class _Response(msgspec.Struct):
+        name: str
+        dt: int
+        main: _Main
+        weather: list[_Condition]
+
+    _decode_response = msgspec.json.Decoder(_Response).decode
+
+def _fields(payload):
+    # (city, timestamp, temperature, humidity, pressure, description) of one response body
+    if msgspec is not None:
+        entry = _decode_response(payload)
+        main = entry.main
+        return entry.name, entry.dt, main.temp, main.humidity, main.pressure, entry.weather[0].description
+    entry = loads(payload)
+    main = entry["main"]
+    return entry["name"], entry["dt"], main["temp"], main["humidity"], main["pressure"], entry["weather"][0]["description"]
+
+def columns_from_payloads(payloads):
+    """
+    Decode raw OpenWeather response bodies (bytes) straight into column arrays.
+
+    With msgspec installed each body is decoded against a schema of just the
+    six fields the weather table needs, so the rest of the response is never
+    turned into Python objects. Without it every body is decoded in full
+    (orjson or json) and the six fields are picked out of the dict. Either
+    way the values go into column arrays allocated once up front.
+
+    Returns:
+    dict: Column name -> numpy array
+    """
+    payloads = payloads if isinstance(payloads, list) else list(payloads)
+    n = len(payloads)
+    cities = np.empty(n, dtype=object)
+    timestamps = np.empty(n, dtype=np.int64)
+    temperatures = np.empty(n, dtype=np.float64)
+    humidities = np.empty(n, dtype=np.int64)
+    pressures = np.empty(n, dtype=np.int64)
+    descriptions = np.empty(n, dtype=object)
+    for i, payload in enumerate(payloads):
+        (cities[i], timestamps[i], temperatures[i],
+         humidities[i], pressures[i], descriptions[i]) = _fields(payload)
+    return {
+        "city": cities,
+        "timestamp": timestamps,
+        "temperature": temperatures,
+        "humidity": humidities,
+        "pressure": pressures,
+        "weather": descriptions
+    }
+
+def columns_from_records(raw_data):
+    # Same columns as columns_from_payloads, from already decoded responses
+    return {
+        "city": [entry["name"] for entry in raw_data],
+        "timestamp": np.array([entry["dt"] for entry in raw_data], dtype=np.int64),
+        "temperature": np.array([entry["main"]["temp"] for entry in raw_data], dtype=np.float64),
+        "humidity": np.array([entry["main"]["humidity"] for entry in raw_data], dtype=np.int64),
+        "pressure": np.array([entry["main"]["pressure"] for entry in raw_data], dtype=np.int64),
+        "weather": [entry["weather"][0]["description"] for entry in raw_data]
+    }
+
+def transform_columns(columns):
+    # Build the frame in one go (one vectorised to_datetime for all records)
+    df = pd.DataFrame({
+        **columns,
+        "timestamp": pd.to_datetime(columns["timestamp"], unit='s'),
+    })
     return df.drop_duplicates().reset_index(drop=True)
+
+def transform_data(raw_data):
+    return transform_columns(columns_from_records(raw_data))
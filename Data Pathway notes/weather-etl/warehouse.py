@@ -0,0 +1,222 @@
+import argparse
+import os
+import time
+from datetime import date, datetime, timezone
+from glob import glob
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Columnar copy of the weather table for analytical reads, as Parquet files in
+# one folder per observation day (UTC):
+#   warehouse/weather/date=2026-10-19/part-101500123456-4242.parquet
+# Every load appends one small file per day it touches; compact_partition
+# merges them once a day folder holds COMPACT_MIN_FILES files.
+WAREHOUSE_DIR = os.getenv("WAREHOUSE_DIR", "warehouse")
+COMPACT_MIN_FILES = int(os.getenv("COMPACT_MIN_FILES", 24))
+
+METRICS = ["temperature", "humidity", "pressure"]
+
+SCHEMA = pa.schema([
+    ("city", pa.string()),
+    ("timestamp", pa.timestamp("s")),
+    ("temperature", pa.float64()),
+    ("humidity", pa.int64()),
+    ("pressure", pa.int64()),
+    ("weather", pa.string()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+def table_dir(table_name="weather", warehouse_dir=None):
+    return os.path.join(warehouse_dir or WAREHOUSE_DIR, table_name)
+
+def _write_file(partition, prefix, table):
+    os.makedirs(partition, exist_ok=True)
+    name = f"{prefix}-{datetime.now(timezone.utc):%H%M%S%f}-{os.getpid()}.parquet"
+    path = os.path.join(partition, name)
+    # Hidden until complete; pyarrow datasets skip files starting with '.'
+    tmp_path = os.path.join(partition, "." + name)
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+    return path
+
+def list_files(partition):
+    return sorted(glob(os.path.join(partition, "*.parquet")))
+
+def write_batch(df, table_name="weather", warehouse_dir=None, compact=True):
+    """
+    Append a transformed batch to the Parquet warehouse, one file per observation day.
+
+    Day folders that reach COMPACT_MIN_FILES files are compacted straight away
+    (pass compact=False to leave that to compact_all).
+
+    Returns:
+    list: Paths of the written files
+    """
+    if df.empty:
+        return []
+    root = table_dir(table_name, warehouse_dir)
+    days = df["timestamp"].dt.strftime("%Y-%m-%d")
+    written = []
+    for day, rows in df.groupby(days, sort=True):
+        table = pa.Table.from_pandas(rows[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+        partition = os.path.join(root, f"date={day}")
+        written.append(_write_file(partition, "part", table))
+        if compact and len(list_files(partition)) >= COMPACT_MIN_FILES:
+            compact_partition(partition)
+    return written
+
+def compact_partition(partition):
+    """
+    Merge every file of one day folder into a single file sorted by city and
+    timestamp, dropping repeated (city, timestamp) observations.
+
+    Only one process may compact at a time: write_batch runs inside the ETL,
+    and `python warehouse.py --compact` takes the same etl.lock.
+
+    The merged file is in place before the small files are removed, so a
+    reader that lists the folder afterwards sees every row once (or both
+    copies for a moment, which read_weather de-duplicates). A reader that
+    listed the small files just before they were removed fails to open
+    them; read_weather then lists the folders again.
+
+    Returns:
+    str: Path of the compacted file, or None if there was nothing to merge
+    """
+    files = list_files(partition)
+    if len(files) < 2:
+        return None
+    table = pq.read_table(files, schema=SCHEMA)
+    df = table.to_pandas().drop_duplicates(["city", "timestamp"]).sort_values(["city", "timestamp"])
+    path = _write_file(partition, "compacted", pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False))
+    for old in files:
+        try:
+            os.remove(old)
+        except FileNotFoundError:
+            pass  # already removed, e.g. by an earlier interrupted compaction
+    return path
+
+def compact_all(table_name="weather", warehouse_dir=None, min_files=2):
+    """
+    Compact every day folder holding at least `min_files` files.
+
+    Returns:
+    int: Number of day folders compacted
+    """
+    compacted = 0
+    for partition in sorted(glob(os.path.join(table_dir(table_name, warehouse_dir), "date=*"))):
+        if len(list_files(partition)) >= min_files and compact_partition(partition):
+            compacted += 1
+    return compacted
+
+# ===============================================================
+# QUERY HELPERS
+# ===============================================================
+
+def _day(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+def _is_date_only(value):
+    # "2026-10-07" or a date object (not a datetime) means the whole day
+    if isinstance(value, str):
+        return len(value.strip()) <= 10
+    return isinstance(value, date) and not isinstance(value, datetime)
+
+def read_weather(start=None, end=None, cities=None, columns=None, table_name="weather", warehouse_dir=None):
+    """
+    Read observations from the warehouse.
+
+    Parameters:
+    start, end: Inclusive time bounds; a date-only end includes that whole day.
+                Day folders outside the bounds are never opened
+    cities (list): Only these cities
+    columns (list): Only these columns (city and timestamp are always read)
+
+    Returns:
+    DataFrame: One row per city per timestamp
+    """
+    root = table_dir(table_name, warehouse_dir)
+    if not os.path.isdir(root):
+        return SCHEMA.empty_table().to_pandas()
+    dataset = ds.dataset(root, format="parquet", schema=SCHEMA.append(pa.field("date", pa.string())),
+                         partitioning=PARTITIONING)
+
+    conditions = []
+    if start is not None:
+        conditions += [ds.field("date") >= _day(start), ds.field("timestamp") >= pd.Timestamp(start)]
+    if end is not None:
+        if _is_date_only(end):
+            time_bound = ds.field("timestamp") < pd.Timestamp(end) + pd.Timedelta(days=1)
+        else:
+            time_bound = ds.field("timestamp") <= pd.Timestamp(end)
+        conditions += [ds.field("date") <= _day(end), time_bound]
+    if cities:
+        conditions.append(ds.field("city").isin(list(cities)))
+    condition = None
+    for part in conditions:
+        condition = part if condition is None else condition & part
+
+    columns = columns or SCHEMA.names
+    names = ["city", "timestamp"] + [name for name in columns if name not in ("city", "timestamp")]
+    try:
+        table = dataset.to_table(columns=names, filter=condition)
+    except FileNotFoundError:
+        # A compaction removed files listed by this dataset; the new listing has the merged file
+        dataset = ds.dataset(root, format="parquet", schema=dataset.schema, partitioning=PARTITIONING)
+        table = dataset.to_table(columns=names, filter=condition)
+    df = table.to_pandas()
+    # Day folders that were not compacted yet may hold the same observation twice
+    return df.drop_duplicates(["city", "timestamp"])
+
+def city_trend(city, start=None, end=None, freq="D", metrics=None, table_name="weather", warehouse_dir=None):
+    """
+    Per-bucket min/max/mean of each metric for one city (e.g. freq="h" or "D").
+
+    Returns:
+    DataFrame: Indexed by bucket start
+    """
+    metrics = metrics or METRICS
+    df = read_weather(start, end, [city], metrics, table_name, warehouse_dir)
+    buckets = df["timestamp"].dt.floor(freq).rename("bucket_start")
+    return df.groupby(buckets)[metrics].agg(["min", "max", "mean"])
+
+def compare_cities(start=None, end=None, cities=None, metrics=None, table_name="weather", warehouse_dir=None):
+    """
+    Side-by-side summary of every city over a period: number of samples and
+    the min/max/mean/std of each metric.
+
+    Returns:
+    DataFrame: One row per city
+    """
+    metrics = metrics or METRICS
+    df = read_weather(start, end, cities, metrics, table_name, warehouse_dir)
+    summary = df.groupby("city")[metrics].agg(["min", "max", "mean", "std"])
+    summary.insert(0, ("samples", ""), df.groupby("city").size())
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query or compact the Parquet weather warehouse")
+    parser.add_argument("--compact", action="store_true", help="Merge the small files of every day folder")
+    parser.add_argument("--city", help="Show the trend of this city instead of the cross-city comparison")
+    parser.add_argument("--since", help="Start of the period, e.g. 2026-10-01")
+    parser.add_argument("--until", help="End of the period, e.g. 2026-10-07T23:59")
+    parser.add_argument("--freq", default="D", help="Trend bucket size as a pandas frequency (default: D)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.compact:
+        # Never compact while an ETL run may be compacting the same folders
+        from etl_pipeline import LOCK_PATH, acquire_run_lock
+        lock_file = acquire_run_lock(LOCK_PATH)
+        if lock_file is None:
+            print(f"⚠️ Another ETL process holds {LOCK_PATH}; not compacting.")
+            raise SystemExit(1)
+        with lock_file:
+            print(f"🧱 Compacted {compact_all()} day folders")
+    elif args.city:
+        print(city_trend(args.city, args.since, args.until, args.freq).to_string())
+    else:
+        print(compare_cities(args.since, args.until).to_string())
+    print(f"⏱️ {(time.perf_counter() - started) * 1000:.0f} ms")
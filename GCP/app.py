@@ -1,12 +1,274 @@
-from flask import Flask, render_template
+from flask import Flask, Response, render_template, jsonify, request, url_for
+from datetime import datetime
+from sqlalchemy import DateTime, bindparam, create_engine, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from cache import TTLCache
+import hashlib
 import os
+import sys
+import threading
 
 app = Flask(__name__)
 
+# Cached API responses expire after one ETL interval at the latest. On top of
+# that every key includes the load counter the ETL bumps with each load
+# (checked at most every VERSION_CHECK_SECONDS), so a new load invalidates the
+# cache within seconds, even when it only adds late or backfilled rows.
+CACHE_TTL = int(os.environ.get("CACHE_TTL", 300))
+VERSION_CHECK_SECONDS = int(os.environ.get("VERSION_CHECK_SECONDS", 15))
+MAX_RANGE_ROWS = int(os.environ.get("MAX_RANGE_ROWS", 5000))
+
+def rows_size(rows):
+    # Approximate in-memory size of a list of row dicts, estimated from the first row
+    if not rows:
+        return 64
+    per_row = 200 + sum(len(str(value)) + 50 for value in rows[0].values())
+    return len(rows) * per_row
+
+# Bounded by entry count and by the approximate size of the cached rows, so
+# clients varying ?start=/?after= can't fill memory with large ranges
+cache = TTLCache(
+    max_entries=int(os.environ.get("CACHE_ENTRIES", 4096)), ttl=CACHE_TTL,
+    max_bytes=int(os.environ.get("CACHE_BYTES", 64 * 1024 * 1024)), sizeof=rows_size
+)
+version_cache = TTLCache(max_entries=1, ttl=VERSION_CHECK_SECONDS)
+
+# Raw rows or the rollup tables maintained by the weather ETL
+RESOLUTIONS = {
+    "raw": ("weather", "timestamp"),
+    "hourly": ("weather_hourly", "bucket_start"),
+    "daily": ("weather_daily", "bucket_start"),
+}
+
+# On-demand charts from the AI content impact analysis (t.py). Rendered images
+# are kept in a byte-bounded LRU cache keyed by the request parameters and the
+# dataset version, so each distinct chart is only drawn once per dataset.
+ANALYSIS_DIR = os.environ.get(
+    "ANALYSIS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Data Pathway notes", "Data Analysis")
+)
+DATASET_PATH = os.environ.get("DATASET_PATH", os.path.join(ANALYSIS_DIR, "Global_AI_Content_Impact_Dataset.csv"))
+CHART_FORMATS = {"png": "image/png", "svg": "image/svg+xml", "webp": "image/webp"}
+MAX_CHART_PIXELS = 4000
+
+chart_cache = TTLCache(max_entries=2048, ttl=None, max_bytes=int(os.environ.get("CHART_CACHE_BYTES", 64 * 1024 * 1024)))
+dataset_cache = TTLCache(max_entries=1, ttl=None)
+# pyplot keeps global state, so charts are drawn one at a time
+render_lock = threading.Lock()
+
+_engine = None
+
+def get_engine():
+    # One pooled engine for the whole app; DB_URL (e.g. sqlite:///weather.db)
+    # overrides the MySQL settings shared with the weather ETL
+    global _engine
+    if _engine is None:
+        url = os.environ.get("DB_URL") or "mysql+mysqlconnector://{}:{}@{}:{}/{}".format(
+            os.environ.get("DB_USER"), os.environ.get("DB_PASSWORD"), os.environ.get("DB_HOST"),
+            os.environ.get("DB_PORT"), os.environ.get("DB_NAME")
+        )
+        options = {"pool_pre_ping": True}
+        if not url.startswith("sqlite"):
+            options.update(pool_size=int(os.environ.get("DB_POOL_SIZE", 10)), max_overflow=20, pool_recycle=1800)
+        _engine = create_engine(url, **options)
+    return _engine
+
+def query(sql, **params):
+    # Typed datetime parameters are stored-format on every dialect (SQLite
+    # compares them as text, so a bare str(datetime) would not match)
+    statement = text(sql).bindparams(*(
+        bindparam(name, type_=DateTime) for name, value in params.items() if isinstance(value, datetime)
+    ))
+    with get_engine().connect() as conn:
+        rows = conn.execute(statement, params).mappings().all()
+    return [
+        {key: value.isoformat() if hasattr(value, "isoformat") else value for key, value in row.items()}
+        for row in rows
+    ]
+
+def data_version():
+    # weather_version is bumped by every weather ETL load (see schema.bump_version).
+    # Before the first load the table doesn't exist yet and there is nothing to cache.
+    def load_version():
+        try:
+            rows = query("SELECT version FROM weather_version WHERE id = 1")
+        except (OperationalError, ProgrammingError):
+            return None
+        return rows[0]["version"] if rows else None
+    return version_cache.get_or_load("version", load_version)
+
+def cached_query(key, sql, **params):
+    return cache.get_or_load((data_version(),) + key, lambda: query(sql, **params))
+
+def parse_time(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be an ISO date/time, e.g. 2026-10-19T08:00")
+
+class BadRequest(Exception):
+    pass
+
+@app.errorhandler(BadRequest)
+def bad_request(error):
+    return jsonify({"error": str(error)}), 400
+
+class DatasetUnavailable(Exception):
+    pass
+
+@app.errorhandler(DatasetUnavailable)
+def dataset_unavailable(error):
+    return jsonify({"error": str(error)}), 503
+
 @app.route("/")
 def index():
     return render_template("index.html")
 
+@app.route("/api/weather/latest")
+def latest_all():
+    rows = cached_query(
+        ("latest",),
+        "SELECT w.* FROM weather w "
+        "JOIN (SELECT city, MAX(timestamp) AS latest FROM weather GROUP BY city) m "
+        "ON w.city = m.city AND w.timestamp = m.latest ORDER BY w.city"
+    )
+    return jsonify(rows)
+
+@app.route("/api/weather/latest/<city>")
+def latest_city(city):
+    rows = cached_query(
+        ("latest", city),
+        "SELECT * FROM weather WHERE city = :city ORDER BY timestamp DESC LIMIT 1",
+        city=city
+    )
+    if not rows:
+        return jsonify({"error": f"No weather data for '{city}'"}), 404
+    return jsonify(rows[0])
+
+@app.route("/api/weather/<city>")
+def city_range(city):
+    """
+    Observations for one city between ?start= and ?end= (?resolution=raw|hourly|daily).
+
+    At most MAX_RANGE_ROWS rows are returned per page. When the range holds
+    more, "truncated" is true and "next" is the URL of the following page
+    (it continues with ?after=, exclusive, from the last returned row).
+    """
+    resolution = request.args.get("resolution", "raw")
+    if resolution not in RESOLUTIONS:
+        raise BadRequest(f"'resolution' must be one of: {', '.join(RESOLUTIONS)}")
+    table, time_column = RESOLUTIONS[resolution]
+    start, end, after = parse_time("start"), parse_time("end"), parse_time("after")
+
+    conditions = ["city = :city"]
+    if start:
+        conditions.append(f"{time_column} >= :start")
+    if after:
+        conditions.append(f"{time_column} > :after")
+    if end:
+        conditions.append(f"{time_column} <= :end")
+    # One extra row tells whether the range goes on past this page
+    rows = cached_query(
+        ("range", city, resolution, start, after, end),
+        f"SELECT * FROM {table} WHERE {' AND '.join(conditions)} "
+        f"ORDER BY {time_column} LIMIT {MAX_RANGE_ROWS + 1}",
+        city=city, start=start, after=after, end=end
+    )
+    truncated = len(rows) > MAX_RANGE_ROWS
+    rows = rows[:MAX_RANGE_ROWS]
+    next_url = None
+    if truncated:
+        next_url = url_for(
+            "city_range", city=city, resolution=resolution,
+            after=rows[-1][time_column], end=request.args.get("end")
+        )
+    return jsonify({"rows": rows, "truncated": truncated, "next": next_url})
+
+@app.route("/api/cache")
+def cache_stats():
+    return jsonify({"queries": cache.stats(), "charts": chart_cache.stats()})
+
+def get_analysis():
+    # Imported on first use so the weather API starts without pandas/matplotlib
+    if ANALYSIS_DIR not in sys.path:
+        sys.path.insert(0, ANALYSIS_DIR)
+    import t as analysis
+    return analysis
+
+def dataset_version():
+    stat = os.stat(DATASET_PATH)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+def load_dataset():
+    df = get_analysis().load_and_clean_data(DATASET_PATH)
+    if df is None:
+        # Raising keeps the failure out of the cache, so the next request retries
+        raise DatasetUnavailable("The dataset could not be loaded")
+    return df
+
+def get_dataset(version):
+    return dataset_cache.get_or_load(version, load_dataset)
+
+def parse_list(name, convert=str):
+    value = request.args.get(name)
+    if not value:
+        return ()
+    try:
+        return tuple(sorted(convert(item.strip()) for item in value.split(",")))
+    except ValueError:
+        raise BadRequest(f"'{name}' must be a comma-separated list")
+
+def parse_pixels(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    if not value.isdigit() or not 50 <= int(value) <= MAX_CHART_PIXELS:
+        raise BadRequest(f"'{name}' must be a number of pixels between 50 and {MAX_CHART_PIXELS}")
+    return int(value)
+
+@app.route("/charts/<name>.<fmt>")
+def chart(name, fmt):
+    """Render a chart on demand, e.g. /charts/regulation_impact.webp?width=800&year=2024&country=USA,India"""
+    analysis = get_analysis()
+    if name not in analysis.CHARTS:
+        return jsonify({"error": f"Unknown chart '{name}'", "charts": sorted(analysis.CHARTS)}), 404
+    if fmt not in CHART_FORMATS:
+        raise BadRequest(f"Format must be one of: {', '.join(CHART_FORMATS)}")
+    width, height = parse_pixels("width"), parse_pixels("height")
+    years = parse_list("year", int)
+    countries = parse_list("country")
+
+    if not os.path.exists(DATASET_PATH):
+        return jsonify({"error": "Dataset not found"}), 503
+    version = dataset_version()
+    key = (version, name, fmt, width, height, years, countries)
+
+    def render():
+        df = get_dataset(version)
+        if years:
+            df = df[df["year"].isin(years)]
+        if countries:
+            df = df[df["country"].isin(countries)]
+        if df.empty:
+            return b""
+        with render_lock:
+            return analysis.render_chart(name, df, fmt, width, height)
+
+    image = chart_cache.get_or_load(key, render)
+    if not image:
+        return jsonify({"error": "No data matches the filters"}), 404
+    etag = hashlib.sha1(repr(key).encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        return Response(status=304)
+    response = Response(image, mimetype=CHART_FORMATS[fmt])
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response
+
 if __name__ == "__main__":
       port = int(os.environ.get("PORT", 8080))
-      app.run(debug=True, host="0.0.0.0", port=port)
\ No newline at end of file
+      app.run(debug=True, host="0.0.0.0", port=port)
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache whose entries also expire after `ttl` seconds
+    (never when ttl is None). With max_bytes set, the total size of the
+    cached values (len() by default, or the given sizeof function) is kept
+    under that budget as well.
+
+    get_or_load coalesces concurrent misses: while one thread runs the loader
+    for a key, other threads asking for the same key wait for its result
+    instead of running the loader again.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300, max_bytes=None, sizeof=len):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.size_bytes = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value, size)
+        self._inflight = {}            # key -> _Pending
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = _Pending()
+
+        if not leader:
+            return pending.wait()
+
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                del self._inflight[key]
+            pending.fail(e)
+            raise
+
+        with self._lock:
+            expires_at = float("inf") if self.ttl is None else time.monotonic() + self.ttl
+            self._remove(key)
+            size = self.sizeof(value) if self.max_bytes is not None else 0
+            self._entries[key] = (expires_at, value, size)
+            self.size_bytes += size
+            # Evict least recently used entries, but always keep the newest one
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self.size_bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+            del self._inflight[key]
+        pending.resolve(value)
+        return value
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+            if self.max_bytes is not None:
+                stats["bytes"] = self.size_bytes
+            return stats
+
+
+class _Pending:
+    """Result slot that followers of a coalesced load wait on."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+
+    def resolve(self, value):
+        self._value = value
+        self._done.set()
+
+    def fail(self, error):
+        self._error = error
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
@@ -0,0 +1,113 @@
+"""
+Tests for the weather API cache, run against a SQLite stand-in for MySQL:
+
+    cd GCP && python -m pytest -q
+
+Rows are written with the weather ETL's own load_data, so the schema and the
+load counter are exactly what the ETL produces.
+"""
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Data Pathway notes", "weather-etl"))
+
+import app
+from cache import TTLCache
+from load import load_data
+
+
+def observations(city, start, periods=1, freq="h"):
+    return pd.DataFrame({
+        "city": city,
+        "timestamp": pd.date_range(start, periods=periods, freq=freq),
+        "temperature": 14.5,
+        "humidity": 80,
+        "pressure": 1012,
+        "weather": "broken clouds",
+    })
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # A file database, so every pooled connection and thread sees the same data
+    monkeypatch.setenv("DB_URL", f"sqlite:///{tmp_path / 'weather.db'}")
+    monkeypatch.setattr(app, "_engine", None)
+    monkeypatch.setattr(app, "cache", TTLCache(max_entries=64, ttl=300))
+    # Re-read the load counter on every request
+    monkeypatch.setattr(app, "version_cache", TTLCache(max_entries=1, ttl=0))
+    return app.app.test_client()
+
+
+def load(df):
+    load_data(df, engine=app.get_engine(), sinks=["db"])
+
+
+def test_concurrent_misses_run_one_query(client, monkeypatch):
+    load(observations("London", "2026-10-01"))
+    calls = []
+    real_query = app.query
+
+    def slow_query(sql, **params):
+        if "weather_version" not in sql:
+            calls.append(sql)
+            time.sleep(0.2)
+        return real_query(sql, **params)
+
+    monkeypatch.setattr(app, "query", slow_query)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(app.app.test_client().get("/api/weather/latest/London")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert [response.status_code for response in results] == [200] * 8
+
+
+def test_new_load_invalidates_cache(client):
+    load(observations("London", "2026-10-02"))
+    assert [row["city"] for row in client.get("/api/weather/latest").get_json()] == ["London"]
+
+    # Older than London's latest row, so MAX(timestamp) would not have changed
+    load(observations("Paris", "2026-10-01"))
+    assert [row["city"] for row in client.get("/api/weather/latest").get_json()] == ["London", "Paris"]
+
+
+def test_range_paging_round_trip(client, monkeypatch):
+    monkeypatch.setattr(app, "MAX_RANGE_ROWS", 10)
+    load(observations("London", "2026-10-01", periods=25))
+
+    url = "/api/weather/London?start=2026-10-01T00:00"
+    pages = []
+    while url:
+        body = client.get(url).get_json()
+        pages.append(len(body["rows"]))
+        assert body["truncated"] == (body["next"] is not None)
+        url = body["next"]
+
+    assert pages == [10, 10, 5]
+
+
+def test_range_pages_cover_every_row_once(client, monkeypatch):
+    monkeypatch.setattr(app, "MAX_RANGE_ROWS", 7)
+    load(observations("London", "2026-10-01", periods=20))
+
+    url = "/api/weather/London?end=2026-10-01T15:00"
+    timestamps = []
+    while url:
+        body = client.get(url).get_json()
+        timestamps += [row["timestamp"] for row in body["rows"]]
+        url = body["next"]
+
+    assert len(timestamps) == 16
+    assert len(set(timestamps)) == 16
+    assert timestamps == sorted(timestamps)